@@ -1,112 +1,603 @@
-from typing import List, Dict, Any
-from config import settings
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+from config import settings, ELITE_SCHOOLS_SET, TOP_TECH_COMPANIES_SET
 from linkedin_scraper import LinkedInScraper
+from database import db_manager
+from models import Candidate, CandidateScore
+from sqlalchemy import insert, select
 import openai
+import asyncio
+import heapq
+import orjson
 import random
+import re
+import numpy as np
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Rubric weights as a float32 vector, in breakdown order
+WEIGHTS = np.array([
+    settings.education_weight,
+    settings.trajectory_weight,
+    settings.company_weight,
+    settings.skills_weight,
+    settings.location_weight,
+    settings.tenure_weight,
+], dtype=np.float32)
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _weighted_sum(cat, w):
+        out = np.empty(cat.shape[0], np.float32)
+        for i in prange(cat.shape[0]):
+            s = 0.0
+            for j in range(cat.shape[1]):
+                s += cat[i, j] * w[j]
+            out[i] = s
+        return out
+else:
+    def _weighted_sum(cat, w):
+        return cat @ w
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _score_kernel(elite, has_school, n_exp, top_company, has_company,
+                      overlap, has_skills, loc_match, tenure):
+        """SoA rubric kernel: one prange pass fills the (N, 6) category
+        matrix instead of a chain of np.select temporaries."""
+        n = elite.shape[0]
+        cat = np.empty((n, 6), np.float32)
+        for i in prange(n):
+            cat[i, 0] = 9.0 if elite[i] else (7.0 if has_school[i] else 5.0)
+            cat[i, 1] = 8.0 if n_exp[i] > 1 else 6.0
+            cat[i, 2] = 9.0 if top_company[i] else (7.0 if has_company[i] else 5.0)
+            if has_skills[i] and overlap[i] >= 3:
+                cat[i, 3] = 9.0
+            elif has_skills[i] and overlap[i] == 2:
+                cat[i, 3] = 7.0
+            elif has_skills[i] and overlap[i] == 1:
+                cat[i, 3] = 6.0
+            else:
+                cat[i, 3] = 5.0
+            cat[i, 4] = 10.0 if loc_match[i] else 6.0
+            cat[i, 5] = tenure[i]
+        return cat
+else:
+    _score_kernel = None
+
+# Known skills the fit rubric looks for in job descriptions
+JOB_SKILLS = ("python", "machine learning", "llm", "deep learning", "backend", "api")
+
+# Breakdown keys in WEIGHTS order
+CATEGORIES = ("education", "trajectory", "company", "skills", "location", "tenure")
+
+# Compiled once; matches "2 years", "18 months", etc. in tenure strings
+_TENURE_RE = re.compile(r"(\d+)\s+(year|month)s?", re.I)
+
+# Shared empty-education default so the outreach fallback doesn't allocate
+# a fresh list per message
+_EMPTY_EDU = ({},)
+
+# Fields the rubric reads; when a search hit already carries all of them
+# there is nothing to gain from a full profile scrape
+REQUIRED_PROFILE_FIELDS = frozenset(
+    {"name", "headline", "current_company", "skills", "education", "experience", "location"}
+)
+
+if AHOCORASICK_AVAILABLE:
+    _SKILL_AUTOMATON = ahocorasick.Automaton()
+    for _skill in JOB_SKILLS:
+        _SKILL_AUTOMATON.add_word(_skill, _skill)
+    _SKILL_AUTOMATON.make_automaton()
+else:
+    _SKILL_AUTOMATON = None
+
+_SKILL_INDEX = {s: i for i, s in enumerate(JOB_SKILLS)}
+
+
+def skill_vector(skills) -> np.ndarray:
+    """Quantize a skills list to a uint8 membership vector over JOB_SKILLS.
+
+    One byte per rubric skill instead of the list-of-strings comparison;
+    stored on Candidate.skill_vector via .tobytes() so persisted rows can be
+    stacked straight into the scoring matrix with np.frombuffer."""
+    candidate_skills = {s.lower() for s in (skills or ())}
+    return np.array([s in candidate_skills for s in JOB_SKILLS], dtype=np.uint8)
+
+
+def _skills_from_text(profile: Dict[str, Any]) -> np.ndarray:
+    """Infer the rubric skill vector from free profile text when the scrape
+    returned no explicit skills list. The automaton matches every rubric
+    skill in one pass over the concatenated headline/about/title text; the
+    fallback is one substring scan per skill."""
+    parts = [profile.get("headline") or "", profile.get("about") or ""]
+    for e in profile.get("experience") or ():
+        parts.append(e.get("title", ""))
+    text = " ".join(parts).lower()
+    vec = np.zeros(len(JOB_SKILLS), dtype=np.uint8)
+    if _SKILL_AUTOMATON is not None:
+        for _, skill in _SKILL_AUTOMATON.iter(text):
+            vec[_SKILL_INDEX[skill]] = 1
+    else:
+        for i, s in enumerate(JOB_SKILLS):
+            if s in text:
+                vec[i] = 1
+    return vec
+
+
+def _extract_job_skills(job_description: str) -> frozenset:
+    """Collect the known skills mentioned in a job description in one pass."""
+    jd_lower = job_description.lower()
+    if _SKILL_AUTOMATON is not None:
+        return frozenset(v for _, v in _SKILL_AUTOMATON.iter(jd_lower))
+    return frozenset(s for s in JOB_SKILLS if s in jd_lower)
+
+
+def _category_scores(profile: Dict[str, Any], job_description: str, job_skills: frozenset):
+    # Simplified rubric; per-category scores on a 0-10 scale
+    breakdown = {}
+    confidence = 1.0
+    # Education
+    education_score = 5
+    if profile.get("education"):
+        school = profile["education"][0].get("school", "")
+        if school.lower() in ELITE_SCHOOLS_SET:
+            education_score = 9
+        elif school:
+            education_score = 7
+    breakdown["education"] = education_score
+    # Trajectory (mock: if >1 experience entries and increasing responsibility)
+    trajectory_score = 8 if profile.get("experience") and len(profile["experience"]) > 1 else 6
+    breakdown["trajectory"] = trajectory_score
+    # Company
+    company_score = 5
+    if (profile.get("current_company") or "").lower() in TOP_TECH_COMPANIES_SET:
+        company_score = 9
+    elif profile.get("current_company"):
+        company_score = 7
+    breakdown["company"] = company_score
+    # Skills
+    skills_score = 5
+    if profile.get("skills"):
+        # crude match: count overlap
+        candidate_skills = frozenset(s.lower() for s in profile["skills"])
+        overlap = len(candidate_skills & job_skills)
+        if overlap >= 3:
+            skills_score = 9
+        elif overlap == 2:
+            skills_score = 7
+        elif overlap == 1:
+            skills_score = 6
+    breakdown["skills"] = skills_score
+    # Location
+    location_score = 6
+    if profile.get("location") and profile["location"] in job_description:
+        location_score = 10
+    breakdown["location"] = location_score
+    # Tenure
+    tenure_score = 7
+    if profile.get("experience"):
+        tenure = profile["experience"][0].get("duration", "")
+        m = _TENURE_RE.search(tenure or "")
+        if m:
+            value, unit = int(m.group(1)), m.group(2).lower()
+            if unit == "month":
+                tenure_score = 4
+            elif value in (2, 3):
+                tenure_score = 9
+            elif value == 1:
+                tenure_score = 6
+    breakdown["tenure"] = tenure_score
+    # Confidence: penalize missing data
+    missing = sum(1 for v in [profile.get("education"), profile.get("experience"), profile.get("skills")] if not v)
+    confidence = max(0.5, 1.0 - 0.15 * missing)
+    return breakdown, confidence
+
+
+def _render_template(candidate: Dict[str, Any], job_description: str) -> str:
+    """No-API-key fallback message; reuses strings precomputed during scoring."""
+    skills_joined = candidate.get("_skills_joined")
+    if skills_joined is None:
+        skills_joined = ", ".join(candidate.get("skills") or [])
+    top_school = candidate.get("_top_school")
+    if top_school is None:
+        top_school = (candidate.get("education") or _EMPTY_EDU)[0].get("school", "your school")
+    return (
+        f"Hi {candidate['name']}, I came across your profile and was impressed by your experience at {candidate.get('current_company', 'your company')}. "
+        f"Your background in {skills_joined} and education at {top_school} "
+        f"seems like a great fit for our role: {job_description[:40]}... Let me know if you’re open to chat!"
+    )
+
+
+def _render_templates(candidates: List[Dict[str, Any]], job_description: str) -> List[str]:
+    """Render the fallback template for a whole batch in one pass."""
+    return [_render_template(c, job_description) for c in candidates]
+
+
+@lru_cache(maxsize=1 << 17)
+def _score_one(jd_norm: str, profile_blob: bytes):
+    """Score one candidate for one job, memoized.
+
+    Keyed on the whitespace-normalized job description and the candidate's
+    canonical (key-sorted) orjson blob, so repeat runs over the same job and
+    profiles are pure cache hits. The breakdown is returned as a tuple of
+    items because cached values are shared between callers."""
+    profile = orjson.loads(profile_blob)
+    job_skills = _extract_job_skills(jd_norm)
+    breakdown, confidence = _category_scores(profile, jd_norm, job_skills)
+    cat = np.asarray([[breakdown[c] for c in CATEGORIES]], dtype=np.float32)
+    score = round(float(_weighted_sum(cat, WEIGHTS)[0]), 2)
+    return score, tuple(breakdown.items()), confidence
+
+
+@dataclass
+class CandidateBatch:
+    """Scored candidates as parallel arrays, sorted best-first.
+
+    Ranking, slicing and printing work on the contiguous arrays;
+    per-candidate dicts (the old AoS shape) are only materialized on demand
+    via candidate()."""
+    profiles: List[Dict[str, Any]]
+    names: List[str]
+    urls: List[str]
+    fit_scores: np.ndarray
+    breakdowns: np.ndarray
+    confidences: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def breakdown_dict(self, i: int) -> Dict[str, int]:
+        return dict(zip(CATEGORIES, (int(v) for v in self.breakdowns[i])))
+
+    def candidate(self, i: int) -> Dict[str, Any]:
+        """Materialize one candidate in the dict shape the outreach path uses."""
+        p = self.profiles[i]
+        return {
+            **p,
+            "fit_score": round(float(self.fit_scores[i]), 2),
+            "score_breakdown": self.breakdown_dict(i),
+            "confidence_level": float(self.confidences[i]),
+            "_skills_joined": ", ".join(p.get("skills") or []),
+            "_top_school": (p.get("education") or _EMPTY_EDU)[0].get("school", "your school"),
+        }
+
 
 class LinkedInSourcingAgent:
-    def __init__(self):
-        self.scraper = LinkedInScraper()
-        openai.api_key = settings.openai_api_key
+    def __init__(self, scraper: LinkedInScraper = None):
+        # Share one scraper (and its caches/connection pools) when provided
+        self.scraper = scraper or LinkedInScraper()
+        self.aclient = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+        # Bound concurrent OpenAI calls to respect rate limits
+        self._openai_semaphore = asyncio.Semaphore(10)
 
-    def search_linkedin(self, job_description: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    async def search_linkedin(self, job_description: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """
         Search for LinkedIn profiles matching the job description.
         """
-        return self.scraper.search_linkedin_profiles(job_description, max_results)
+        return await self.scraper.search_linkedin_profiles(job_description, max_results)
 
-    def score_candidates(self, candidates: List[Dict[str, Any]], job_description: str) -> List[Dict[str, Any]]:
+    async def score_candidates(self, candidates: List[Dict[str, Any]], job_description: str) -> CandidateBatch:
         """
         Score candidates using the fit score rubric.
+        Profile fetches fan out concurrently; scoring runs over the results.
+        Returns a best-first CandidateBatch of parallel arrays.
         """
-        scored = []
-        for c in candidates:
-            profile = self.scraper.extract_profile_data(c.get("linkedin_url", ""))
-            score, breakdown, confidence = self._fit_score(profile, job_description)
-            scored.append({
-                **profile,
-                "fit_score": score,
-                "score_breakdown": breakdown,
-                "confidence_level": confidence
+        profiles = await self._profiles_for(candidates)
+        if not profiles:
+            return CandidateBatch(
+                [], [], [],
+                np.empty(0, np.float32), np.empty((0, 6), np.float32), np.empty(0)
+            )
+        job_skills = _extract_job_skills(job_description)
+        cat, confidences = self._category_matrix(profiles, job_description, job_skills)
+        totals = _weighted_sum(cat, WEIGHTS)
+        order = np.argsort(-totals)
+        profiles = [profiles[i] for i in order]
+        return CandidateBatch(
+            profiles=profiles,
+            names=[p.get("name", "") for p in profiles],
+            urls=[p.get("linkedin_url", "") for p in profiles],
+            fit_scores=totals[order],
+            breakdowns=cat[order],
+            confidences=confidences[order],
+        )
+
+    async def rank_and_message(self, candidates: List[Dict[str, Any]], job_description: str, top_n: int):
+        """
+        Fused batch pipeline: fetch and score every candidate, keep only the
+        top_n, and generate outreach just for the winners (attached as
+        "outreach_message"). Returns (candidates_found, winners).
+        """
+        scored, totals = await self._fetch_and_score(candidates, job_description)
+        if not scored:
+            return 0, []
+        winners = heapq.nlargest(top_n, scored, key=lambda x: x["fit_score"])
+        messages = await self.generate_outreach(winners, job_description)
+        for c, m in zip(winners, messages):
+            c["outreach_message"] = m["message"]
+        return len(scored), winners
+
+    def persist_candidates(self, scored: List[Dict[str, Any]], job_id: int) -> int:
+        """Persist a scored batch with a handful of bulk statements.
+
+        Candidates already in the table (linkedin_url is unique) are
+        reused rather than re-inserted; new ones go in as one multi-row
+        INSERT .. RETURNING (chunked by insertmanyvalues_page_size) so
+        their generated ids come back without per-row round trips. Score
+        rows are then bulk-inserted against those ids."""
+        if not scored:
+            return 0
+        # Dedupe on URL within the batch too; a repeated candidate would
+        # otherwise trip the same unique constraint
+        rows_by_url = {}
+        for c in scored:
+            rows_by_url.setdefault(c.get("linkedin_url", ""), {
+                "job_id": job_id,
+                "name": c.get("name", ""),
+                "linkedin_url": c.get("linkedin_url", ""),
+                "headline": c.get("headline"),
+                "current_company": c.get("current_company"),
+                "location": c.get("location"),
+                "education": c.get("education"),
+                "experience": c.get("experience"),
+                "skills": c.get("skills"),
+                "skill_vector": c.get("skill_vector") or skill_vector(c.get("skills")).tobytes(),
+                "github_url": c.get("github_url"),
+                "twitter_url": c.get("twitter_url"),
+                "personal_website": c.get("personal_website"),
             })
-        # Sort by score
-        scored.sort(key=lambda x: x["fit_score"], reverse=True)
-        return scored
-
-    def _fit_score(self, profile: Dict[str, Any], job_description: str):
-        # Simplified rubric using settings weights
-        weights = settings
-        breakdown = {}
-        confidence = 1.0
-        # Education
-        education_score = 5
-        if profile.get("education"):
-            school = profile["education"][0].get("school", "")
-            if school in weights.elite_schools:
-                education_score = 9
-            elif school:
-                education_score = 7
-        breakdown["education"] = education_score
-        # Trajectory (mock: if >1 experience entries and increasing responsibility)
-        trajectory_score = 8 if profile.get("experience") and len(profile["experience"]) > 1 else 6
-        breakdown["trajectory"] = trajectory_score
-        # Company
-        company_score = 5
-        if profile.get("current_company") in weights.top_tech_companies:
-            company_score = 9
-        elif profile.get("current_company"):
-            company_score = 7
-        breakdown["company"] = company_score
-        # Skills
-        skills_score = 5
-        if profile.get("skills"):
-            # crude match: count overlap
-            job_skills = [s.lower() for s in ["python", "machine learning", "llm", "deep learning", "backend", "api"] if s in job_description.lower()]
-            overlap = len(set([s.lower() for s in profile["skills"]]) & set(job_skills))
-            if overlap >= 3:
-                skills_score = 9
-            elif overlap == 2:
-                skills_score = 7
-            elif overlap == 1:
-                skills_score = 6
-        breakdown["skills"] = skills_score
-        # Location
-        location_score = 6
-        if profile.get("location") and profile["location"] in job_description:
-            location_score = 10
-        breakdown["location"] = location_score
-        # Tenure
-        tenure_score = 7
-        if profile.get("experience"):
-            tenure = profile["experience"][0].get("duration", "")
-            if "2 years" in tenure or "3 years" in tenure:
-                tenure_score = 9
-            elif "1 year" in tenure:
-                tenure_score = 6
-            elif "months" in tenure:
-                tenure_score = 4
-        breakdown["tenure"] = tenure_score
-        # Weighted sum
-        score = (
-            education_score * weights.education_weight +
-            trajectory_score * weights.trajectory_weight +
-            company_score * weights.company_weight +
-            skills_score * weights.skills_weight +
-            location_score * weights.location_weight +
-            tenure_score * weights.tenure_weight
+        with db_manager.SessionLocal() as session:
+            ids_by_url = dict(session.execute(
+                select(Candidate.linkedin_url, Candidate.id)
+                .where(Candidate.linkedin_url.in_(rows_by_url))
+            ).all())
+            new_rows = [
+                row for url, row in rows_by_url.items() if url not in ids_by_url
+            ]
+            if new_rows:
+                returned = session.scalars(
+                    insert(Candidate).returning(
+                        Candidate.id, sort_by_parameter_order=True
+                    ),
+                    new_rows,
+                ).all()
+                for row, cid in zip(new_rows, returned):
+                    ids_by_url[row["linkedin_url"]] = cid
+            score_rows = [
+                {
+                    "candidate_id": ids_by_url[c.get("linkedin_url", "")],
+                    "job_id": job_id,
+                    "overall_score": c.get("fit_score", 0.0),
+                    "education_score": c.get("score_breakdown", {}).get("education"),
+                    "trajectory_score": c.get("score_breakdown", {}).get("trajectory"),
+                    "company_score": c.get("score_breakdown", {}).get("company"),
+                    "skills_score": c.get("score_breakdown", {}).get("skills"),
+                    "location_score": c.get("score_breakdown", {}).get("location"),
+                    "tenure_score": c.get("score_breakdown", {}).get("tenure"),
+                    "score_breakdown": c.get("score_breakdown"),
+                    "confidence_level": c.get("confidence_level", 1.0),
+                }
+                for c in scored
+            ]
+            session.bulk_insert_mappings(CandidateScore, score_rows)
+            session.commit()
+        return len(score_rows)
+
+    def top_candidates(self, job_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Read the top scored candidates for a job with one Core query.
+
+        Selecting explicit columns returns plain row tuples — no ORM
+        identity-map hydration and no lazy relationship loads per row —
+        and the (job_id, overall_score DESC) index serves the ORDER BY
+        without a sort."""
+        stmt = (
+            select(
+                Candidate.name,
+                Candidate.linkedin_url,
+                Candidate.headline,
+                Candidate.current_company,
+                CandidateScore.overall_score,
+                CandidateScore.score_breakdown,
+                CandidateScore.confidence_level,
+            )
+            .join(CandidateScore, CandidateScore.candidate_id == Candidate.id)
+            .where(CandidateScore.job_id == job_id)
+            .order_by(CandidateScore.overall_score.desc())
+            .limit(limit)
+        )
+        with db_manager.engine.connect() as conn:
+            return [dict(row._mapping) for row in conn.execute(stmt)]
+
+    async def _profile_for(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the search hit itself when it already has every field the
+        rubric needs; otherwise fetch the full profile."""
+        if REQUIRED_PROFILE_FIELDS.issubset(candidate):
+            return candidate
+        return await self.scraper.aextract_profile_data(candidate.get("linkedin_url", ""))
+
+    async def _profiles_for(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Resolve profiles for a batch: complete search hits pass through,
+        everything else goes through the scraper's batch path so the cache
+        lookups collapse into one MGET and only misses hit LinkedIn."""
+        need_fetch = [
+            (i, c.get("linkedin_url", "")) for i, c in enumerate(candidates)
+            if not REQUIRED_PROFILE_FIELDS.issubset(c)
+        ]
+        profiles = list(candidates)
+        if need_fetch:
+            fetched = await self.scraper.extract_profiles_batch([u for _, u in need_fetch])
+            for (i, _), profile in zip(need_fetch, fetched):
+                profiles[i] = profile or {}
+        return profiles
+
+    async def _fetch_and_score(self, candidates: List[Dict[str, Any]], job_description: str):
+        """Fetch profiles concurrently and score them. Returns the scored
+        dicts in input order plus the raw totals array for ranking."""
+        profiles = await self._profiles_for(candidates)
+        if not profiles:
+            return [], None
+        # Scan the job description once instead of once per candidate
+        job_skills = _extract_job_skills(job_description)
+        cat, confidences = self._category_matrix(profiles, job_description, job_skills)
+        totals = _weighted_sum(cat, WEIGHTS)
+        scored = [
+            {
+                **profiles[i],
+                "fit_score": round(float(totals[i]), 2),
+                "score_breakdown": dict(zip(CATEGORIES, (int(v) for v in cat[i]))),
+                "confidence_level": float(confidences[i]),
+                # Precomputed once here so the outreach fallback doesn't
+                # rebuild them per message
+                "_skills_joined": ", ".join(profiles[i].get("skills") or []),
+                "_top_school": (profiles[i].get("education") or _EMPTY_EDU)[0].get("school", "your school")
+            }
+            for i in range(len(profiles))
+        ]
+        return scored, totals
+
+    def _category_matrix(self, profiles, job_description: str, job_skills: frozenset):
+        """Compute every candidate's per-category scores as one (N, 6)
+        float32 matrix. Sub-scores are assembled with np.select over masks
+        and the skills overlap is a bag-of-words matmul, so the per-candidate
+        work is field extraction rather than rubric arithmetic."""
+        n = len(profiles)
+        schools = [
+            (p["education"][0].get("school", "") if p.get("education") else "").lower()
+            for p in profiles
+        ]
+        has_school = np.array([bool(s) for s in schools])
+        elite = np.array([s in ELITE_SCHOOLS_SET for s in schools])
+
+        n_exp = np.array([len(p.get("experience") or ()) for p in profiles])
+
+        companies = [(p.get("current_company") or "").lower() for p in profiles]
+        has_company = np.array([bool(c) for c in companies])
+        top_company = np.array([c in TOP_TECH_COMPANIES_SET for c in companies])
+
+        # Bag-of-words overlap: (N, K) membership matrix @ (K,) job vector.
+        # Rows come from the persisted quantized vector when present.
+        job_vec = np.array([s in job_skills for s in JOB_SKILLS], dtype=np.uint8)
+        # Prepared vectors live in this side list, index-aligned with
+        # profiles; the dicts themselves are shared with the scraper's
+        # in-process cache and must not be annotated with raw bytes
+        rows = []
+        for p in profiles:
+            if p.get("skill_vector"):
+                rows.append(np.frombuffer(p["skill_vector"], dtype=np.uint8))
+            elif p.get("skills"):
+                rows.append(skill_vector(p["skills"]))
+            else:
+                rows.append(_skills_from_text(p))
+        skill_matrix = np.stack(rows)
+        overlap = (skill_matrix @ job_vec).astype(np.int32)
+        # Text-inferred skills count as evidence too, so a profile whose
+        # skills section didn't scrape isn't pinned to the neutral score
+        has_skills = (
+            np.array([bool(p.get("skills")) for p in profiles])
+            | (skill_matrix.sum(axis=1) > 0)
+        )
+
+        loc_match = np.array([
+            bool(p.get("location")) and p["location"] in job_description
+            for p in profiles
+        ])
+
+        # Tenure needs a regex over free text; stays a Python pass
+        tenure = np.full(n, 7, dtype=np.float32)
+        for i, p in enumerate(profiles):
+            if p.get("experience"):
+                m = _TENURE_RE.search(p["experience"][0].get("duration", "") or "")
+                if m:
+                    value, unit = int(m.group(1)), m.group(2).lower()
+                    if unit == "month":
+                        tenure[i] = 4
+                    elif value in (2, 3):
+                        tenure[i] = 9
+                    elif value == 1:
+                        tenure[i] = 6
+
+        if _score_kernel is not None:
+            cat = _score_kernel(
+                elite, has_school, n_exp.astype(np.int32),
+                top_company, has_company, overlap, has_skills,
+                loc_match, tenure
+            )
+        else:
+            education = np.select([elite, has_school], [9, 7], 5)
+            trajectory = np.where(n_exp > 1, 8, 6)
+            company = np.select([top_company, has_company], [9, 7], 5)
+            skills = np.select(
+                [has_skills & (overlap >= 3), has_skills & (overlap == 2), has_skills & (overlap == 1)],
+                [9, 7, 6], 5
+            )
+            location = np.where(loc_match, 10, 6)
+            cat = np.stack(
+                [education, trajectory, company, skills, location, tenure], axis=1
+            ).astype(np.float32)
+        missing = (
+            np.array([not p.get("education") for p in profiles], dtype=np.int8)
+            + (n_exp == 0).astype(np.int8)
+            + (~has_skills).astype(np.int8)
         )
-        # Confidence: penalize missing data
-        missing = sum(1 for v in [profile.get("education"), profile.get("experience"), profile.get("skills")] if not v)
-        confidence = max(0.5, 1.0 - 0.15 * missing)
-        return round(score, 2), breakdown, confidence
+        confidences = np.maximum(0.5, 1.0 - 0.15 * missing)
+        return cat, confidences
+
+    def _fit_score(self, profile: Dict[str, Any], job_description: str, job_skills: frozenset = None):
+        # Memoized on (normalized jd, canonical profile blob): re-scoring the
+        # same candidate for the same job is a cache hit, not a recompute
+        jd_norm = " ".join(job_description.split())
+        blob = orjson.dumps(profile, default=str, option=orjson.OPT_SORT_KEYS)
+        score, breakdown_items, confidence = _score_one(jd_norm, blob)
+        return score, dict(breakdown_items), confidence
 
-    def generate_outreach(self, candidates: List[Dict[str, Any]], job_description: str) -> List[Dict[str, Any]]:
+    async def generate_outreach(self, candidates: List[Dict[str, Any]], job_description: str) -> List[Dict[str, Any]]:
         """
         Generate personalized outreach messages for candidates.
+        Uses a single batched OpenAI call for all candidates; falls back to
+        concurrent per-candidate generation if the batch can't be parsed.
         """
+        if not candidates:
+            return []
+        if not settings.openai_api_key:
+            # Pure templating: render the whole batch in one executor hop so
+            # the string building happens off the event loop
+            rendered = await asyncio.get_running_loop().run_in_executor(
+                None, _render_templates, candidates, job_description
+            )
+            return [
+                {"candidate": c["name"], "linkedin_url": c["linkedin_url"], "message": m}
+                for c, m in zip(candidates, rendered)
+            ]
+        batch = await self._generate_messages_batch(candidates, job_description)
+        fallback_results = {}
+        misses = [
+            (i, c) for i, c in enumerate(candidates)
+            if batch is None or not batch.get(i)
+        ]
+        if misses:
+            results = await asyncio.gather(
+                *[self._generate_message(c, job_description) for _, c in misses],
+                return_exceptions=True
+            )
+            for (i, c), result in zip(misses, results):
+                if isinstance(result, Exception):
+                    result = f"Hi {c['name']}, we'd love to connect about a new opportunity! (OpenAI error: {result})"
+                fallback_results[i] = result
         messages = []
-        for c in candidates:
-            message = self._generate_message(c, job_description)
+        for i, c in enumerate(candidates):
+            message = batch[i] if batch is not None and batch.get(i) else fallback_results[i]
             messages.append({
                 "candidate": c["name"],
                 "linkedin_url": c["linkedin_url"],
@@ -114,7 +605,51 @@ class LinkedInSourcingAgent:
             })
         return messages
 
-    def _generate_message(self, candidate: Dict[str, Any], job_description: str) -> str:
+    async def _generate_messages_batch(self, candidates: List[Dict[str, Any]], job_description: str) -> Optional[Dict[int, str]]:
+        """
+        Generate outreach for all candidates in one chat completion call.
+        Returns a dict mapping candidate index -> message, or None if the
+        call or JSON parse fails (caller falls back to per-candidate path).
+        """
+        # Compact serialization: only the fields the model needs
+        compact = [
+            {
+                "i": i,
+                "name": c.get("name", ""),
+                "headline": c.get("headline", ""),
+                "company": c.get("current_company", ""),
+                "skills": (c.get("skills") or [])[:3],
+            }
+            for i, c in enumerate(candidates)
+        ]
+        prompt = (
+            f"For each candidate below, write a concise, professional LinkedIn outreach message for this job: {job_description}. "
+            "Highlight their background and explain why they're a great fit. "
+            'Return JSON: {"messages": [{"i": 0, "message": "..."}, ...]} with one entry per candidate.\n'
+            f"Candidates: {orjson.dumps(compact).decode()}"
+        )
+        try:
+            async with self._openai_semaphore:
+                response = await self.aclient.chat.completions.create(
+                    model=settings.outreach_model,
+                    messages=[
+                        {"role": "system", "content": "Write each LinkedIn outreach under 40 words. No preamble."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format={"type": "json_object"},
+                    max_tokens=settings.outreach_max_tokens * len(candidates),
+                    temperature=0.3
+                )
+            parsed = orjson.loads(response.choices[0].message.content)
+            return {
+                int(item["i"]): item["message"].strip()
+                for item in parsed.get("messages", [])
+                if item.get("message")
+            }
+        except Exception:
+            return None
+
+    async def _generate_message(self, candidate: Dict[str, Any], job_description: str) -> str:
         # Use OpenAI if key provided, else template
         if settings.openai_api_key:
             prompt = (
@@ -123,18 +658,18 @@ class LinkedInSourcingAgent:
                 "Explain why they're a great fit."
             )
             try:
-                response = openai.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=120
-                )
+                async with self._openai_semaphore:
+                    response = await self.aclient.chat.completions.create(
+                        model=settings.outreach_model,
+                        messages=[
+                            {"role": "system", "content": "Write a LinkedIn outreach under 40 words. No preamble."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        max_tokens=settings.outreach_max_tokens,
+                        temperature=0.3
+                    )
                 return response.choices[0].message.content.strip()
             except Exception as e:
                 return f"Hi {candidate['name']}, we'd love to connect about a new opportunity! (OpenAI error: {e})"
         else:
-            # Fallback template
-            return (
-                f"Hi {candidate['name']}, I came across your profile and was impressed by your experience at {candidate.get('current_company', 'your company')}. "
-                f"Your background in {', '.join(candidate.get('skills', []))} and education at {candidate.get('education', [{}])[0].get('school', 'your school')} "
-                f"seems like a great fit for our role: {job_description[:40]}... Let me know if you’re open to chat!"
-            )
+            return _render_template(candidate, job_description)
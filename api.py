@@ -1,18 +1,56 @@
 from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+import orjson
 from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
 from agent import LinkedInSourcingAgent
+from linkedin_scraper import LinkedInScraper
+from database import db_manager
 from config import settings
+import aiohttp
+import heapq
+import os
+import xxhash
 import uvicorn
 import asyncio
+import concurrent.futures
 import traceback
+import logging
 
-app = FastAPI(title="LinkedIn Sourcing Agent API", description="Find, score, and message top candidates for any job.")
-
-agent = LinkedInSourcingAgent()
+logger = logging.getLogger(__name__)
 
-from linkedin_scraper import LinkedInScraper
+# Single shared scraper: one connection pool, one cache, one rate-limit
+# budget. The agent reuses it instead of constructing its own.
 scraper = LinkedInScraper(use_serpapi=True, use_rapidapi=True)
+agent = LinkedInSourcingAgent(scraper=scraper)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled session for all outbound scraping: connections (and TLS
+    # handshakes) are reused across requests instead of re-established
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=50, ttl_dns_cache=300, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=20),
+    )
+    scraper.set_aio_session(session)
+    app.state.scraper = scraper
+    # Remaining cold-start costs paid here, not on the first request:
+    # table creation and forking the scoring worker processes
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, db_manager.create_tables)
+    await loop.run_in_executor(_POOL, int, 0)
+    yield
+    await scraper.close_aio_session()
+
+
+app = FastAPI(
+    title="LinkedIn Sourcing Agent API",
+    description="Find, score, and message top candidates for any job.",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 from fastapi import Query
 from pydantic import BaseModel
@@ -23,26 +61,22 @@ class LinkedInSearchRequest(BaseModel):
 
 @app.post("/search_linkedin_profiles")
 async def search_linkedin_profiles(request: LinkedInSearchRequest):
-    import traceback
     try:
         results = await scraper.search_linkedin_profiles(request.query, max_results=request.max_results)
         return {"results": results}
     except Exception as e:
-        print(f"Exception in /search_linkedin_profiles for {request.query}: {e}")
-        print(traceback.format_exc())
+        logger.exception(f"Exception in /search_linkedin_profiles for {request.query}")
         return {"error": f"Internal server error: {str(e)}", "trace": traceback.format_exc()}, 500
 
 @app.post("/fetch_profile")
 def fetch_profile(linkedin_url: str):
-    import traceback
     try:
         profile_data = scraper.extract_profile_data(linkedin_url)
         if not profile_data or (isinstance(profile_data, dict) and profile_data.get('error')):
             return {"error": profile_data.get('error', 'Profile not found or could not be scraped.')}, 400
         return profile_data
     except Exception as e:
-        print(f"Exception in /fetch_profile for {linkedin_url}: {e}")
-        print(traceback.format_exc())
+        logger.exception(f"Exception in /fetch_profile for {linkedin_url}")
         return {"error": f"Internal server error: {str(e)}", "trace": traceback.format_exc()}, 500
 
 class JobInput(BaseModel):
@@ -64,39 +98,163 @@ class BatchJobRequest(BaseModel):
 
 @app.post("/candidates")
 async def get_candidates(request: BatchJobRequest):
+    # Process jobs concurrently and stream each one's result as an NDJSON
+    # line as soon as it finishes, instead of blocking on the whole batch.
+    # Failures become an error line for that job; by the time a result is
+    # ready the 200 header is already out, so raising here would just
+    # truncate the stream for every job still pending.
+    async def one(job: JobInput) -> Dict[str, Any]:
+        try:
+            return await _candidates_for_job(job, request.top_n)
+        except Exception as e:
+            logger.exception(f"Exception in /candidates for job {job.title}")
+            return {
+                "job_id": job.job_id or job.title.replace(" ", "-").lower(),
+                "error": f"Internal server error: {str(e)}",
+            }
+
+    tasks = [one(job) for job in request.jobs]
+
+    async def gen():
+        for coro in asyncio.as_completed(tasks):
+            yield orjson.dumps(await coro) + b"\n"
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
+
+
+async def _candidates_for_job(job: JobInput, top_n: int) -> Dict[str, Any]:
     # Only focus on getting most relevant candidates for each job
-    output = []
-    for job in request.jobs:
-        # Build search query from job title, location, and key requirements
-        search_terms = f"{job.title} {job.location} " + " ".join(job.requirements[:3])
-        candidates = await scraper.search_linkedin_profiles(search_terms, max_results=request.top_n * 3)
-        scored_candidates = []
-        for cand in candidates:
-            # Extract profile data and score
-            profile_data = scraper.extract_profile_data(cand['url'])
-            # Score profile for fit (simple example, can be improved)
-            fit_score, score_breakdown = score_profile_for_job(profile_data, job)
-            scored_candidates.append({
-                "name": profile_data.get("name", ""),
-                "linkedin_url": cand['url'],
-                "fit_score": fit_score,
-                "score_breakdown": score_breakdown,
-                "outreach_message": generate_outreach_message(profile_data, job)
-            })
-        # Sort by fit_score and take top N
-        scored_candidates.sort(key=lambda x: x["fit_score"], reverse=True)
-        top_candidates = scored_candidates[:request.top_n]
-        output.append({
-            "job_id": job.job_id or job.title.replace(" ", "-").lower(),
-            "candidates_found": len(scored_candidates),
-            "top_candidates": top_candidates
+    # Build search query from job title, location, and key requirements
+    search_terms = f"{job.title} {job.location} " + " ".join(job.requirements[:3])
+    candidates = await scraper.search_linkedin_profiles(search_terms, max_results=top_n * 3)
+    # Fetch profiles concurrently, collapsing duplicate URLs (common with
+    # the 3x over-fetch) to a single inflight task each
+    fetches = {
+        url: asyncio.create_task(scraper.aextract_profile_data(url))
+        for url in dict.fromkeys(cand['url'] for cand in candidates)
+    }
+    profile_by_url = {url: await task for url, task in fetches.items()}
+    # Vectorized skills overlap: one matrix product for the whole batch
+    batch_profiles = [profile_by_url[cand['url']] for cand in candidates]
+    job_skill_set = {s.lower() for s in job.requirements if len(s) < 30}
+    overlaps = _skills_overlap_counts(batch_profiles, job_skill_set)
+    # Offload the CPU-bound scoring pass to the process pool
+    scores = await asyncio.get_event_loop().run_in_executor(
+        _POOL, _score_batch, batch_profiles, job.model_dump(), [int(o) for o in overlaps]
+    )
+    scored_candidates = []
+    for cand, profile_data, (fit_score, score_breakdown) in zip(candidates, batch_profiles, scores):
+        scored_candidates.append({
+            "name": profile_data.get("name", ""),
+            "linkedin_url": cand['url'],
+            "fit_score": fit_score,
+            "score_breakdown": score_breakdown,
+            "outreach_message": generate_outreach_message(profile_data, job)
         })
-    return output
+    # Top N by fit_score: O(N log top_n) instead of sorting everything
+    top_candidates = heapq.nlargest(
+        top_n, scored_candidates, key=lambda x: x["fit_score"]
+    )
+    return {
+        "job_id": job.job_id or job.title.replace(" ", "-").lower(),
+        "candidates_found": len(scored_candidates),
+        "top_candidates": top_candidates
+    }
 
 # --- Helper functions ---
-import random
+import re
+import numpy as np
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Rubric weights resolved once; pydantic settings attribute access is not
+# free on a per-candidate hot path
+_W = (
+    settings.education_weight,
+    settings.trajectory_weight,
+    settings.company_weight,
+    settings.skills_weight,
+    settings.location_weight,
+    settings.tenure_weight,
+)
+
+# Lookup sets built once at import; the optional lists fall back to empty
+# when not configured, matching the old getattr defaults
+from config import ELITE_SCHOOLS_SET, TOP_TECH_COMPANIES_SET
+STRONG_SCHOOLS_SET = frozenset(s.lower() for s in getattr(settings, "strong_schools", []))
+RELEVANT_INDUSTRIES_SET = frozenset(s.lower() for s in getattr(settings, "relevant_industries", []))
+
+
+def _make_matcher(terms):
+    """Build a single-pass "does text contain any of these terms" predicate,
+    using an Aho-Corasick automaton when available and a compiled regex
+    alternation otherwise."""
+    if not terms:
+        return lambda text: False
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for t in terms:
+            automaton.add_word(t, t)
+        automaton.make_automaton()
+
+        def match(text, _a=automaton):
+            for _ in _a.iter(text):
+                return True
+            return False
+        return match
+    pattern = re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)))
+    return lambda text, _p=pattern: _p.search(text) is not None
+
+
+_TOP_COMPANY_MATCH = _make_matcher(TOP_TECH_COMPANIES_SET)
+_RELEVANT_INDUSTRY_MATCH = _make_matcher(RELEVANT_INDUSTRIES_SET)
+
+# Process pool for the CPU-bound scoring pass, so multi-job batches score
+# in parallel across cores while the event loop keeps servicing I/O
+_POOL = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+def _score_batch(profiles, job_dict, overlaps):
+    """Picklable scoring pass run inside the process pool."""
+    job = JobInput(**job_dict)
+    return [
+        score_profile_for_job(p, job, skills_overlap=o)
+        for p, o in zip(profiles, overlaps)
+    ]
+
+
+def _skills_overlap_counts(profiles, job_skills):
+    """
+    Count job-skill overlaps for all profiles at once.
+    Candidate skills are encoded as rows of a boolean bag-of-words matrix,
+    so the per-candidate set intersections collapse into one matrix product.
+    """
+    vocab = {}
+    rows = []
+    for p in profiles:
+        skills = {s.lower() for s in (p.get("skills") or [])}
+        rows.append(skills)
+        for s in skills:
+            vocab.setdefault(s, len(vocab))
+    for s in job_skills:
+        vocab.setdefault(s, len(vocab))
+    if not vocab:
+        return np.zeros(len(profiles), dtype=np.int64)
+    M = np.zeros((len(profiles), len(vocab)), dtype=np.uint8)
+    for r, skills in enumerate(rows):
+        for s in skills:
+            M[r, vocab[s]] = 1
+    job_vec = np.zeros(len(vocab), dtype=np.uint8)
+    for s in job_skills:
+        job_vec[vocab[s]] = 1
+    return (M @ job_vec.astype(np.int64))
+
 
-def score_profile_for_job(profile_data, job):
+def score_profile_for_job(profile_data, job, skills_overlap=None):
     """
     Fit Score Rubric (Simplified):
     - Education (20%)
@@ -107,7 +265,6 @@ def score_profile_for_job(profile_data, job):
     - Tenure (10%)
     Each category is scored 0-10, then weighted.
     """
-    import random
     score = 0
     breakdown = {}
 
@@ -116,8 +273,8 @@ def score_profile_for_job(profile_data, job):
     # Strong schools: 7-8
     # Standard universities: 5-6
     # Clear progression: 8-10
-    elite_schools = set(s.lower() for s in getattr(settings, "elite_schools", []))
-    strong_schools = set(s.lower() for s in getattr(settings, "strong_schools", [])) if hasattr(settings, "strong_schools") else set()
+    elite_schools = ELITE_SCHOOLS_SET
+    strong_schools = STRONG_SCHOOLS_SET
     educations = profile_data.get("education") or []
     edu_score = 0
     if educations:
@@ -133,7 +290,7 @@ def score_profile_for_job(profile_data, job):
         if len(educations) > 1:
             edu_score = max(edu_score, 8)
     breakdown["education"] = edu_score if edu_score else 2
-    score += breakdown["education"] * 0.20
+    score += breakdown["education"] * _W[0]
 
     # --- Career Trajectory (20%) ---
     # Steady growth: 6-8, Limited progression: 3-5
@@ -149,47 +306,48 @@ def score_profile_for_job(profile_data, job):
         else:
             trajectory_score = 4
     breakdown["trajectory"] = trajectory_score if trajectory_score else 3
-    score += breakdown["trajectory"] * 0.20
+    score += breakdown["trajectory"] * _W[1]
 
     # --- Company Relevance (15%) ---
     # Top tech companies: 9-10, Relevant industry: 7-8, Any experience: 5-6
-    top_companies = set(s.lower() for s in getattr(settings, "top_companies", [])) if hasattr(settings, "top_companies") else set()
-    relevant_industries = set(s.lower() for s in getattr(settings, "relevant_industries", [])) if hasattr(settings, "relevant_industries") else set()
+    # Single multi-pattern scan per company string instead of the
+    # |companies| x |terms| substring cross product
     cand_company = (profile_data.get("current_company") or "").lower()
     company_score = 0
     if cand_company:
-        if any(tc in cand_company for tc in top_companies):
+        if _TOP_COMPANY_MATCH(cand_company):
             company_score = 10
-        elif any(ri in cand_company for ri in relevant_industries):
+        elif _RELEVANT_INDUSTRY_MATCH(cand_company):
             company_score = 8
         else:
             company_score = 6
     elif experience:
         companies = [e.get("company", "").lower() for e in experience if e.get("company")]
-        if any(tc in c for tc in top_companies for c in companies):
+        if any(_TOP_COMPANY_MATCH(c) for c in companies):
             company_score = 9
-        elif any(ri in c for ri in relevant_industries for c in companies):
+        elif any(_RELEVANT_INDUSTRY_MATCH(c) for c in companies):
             company_score = 7
         elif companies:
             company_score = 5
     breakdown["company"] = company_score if company_score else 3
-    score += breakdown["company"] * 0.15
+    score += breakdown["company"] * _W[2]
 
     # --- Experience Match (25%) ---
     # Perfect skill match: 9-10, Strong overlap: 7-8, Some: 5-6
     job_skills = set([s.lower() for s in job.requirements if len(s) < 30])
-    cand_skills = set([s.lower() for s in profile_data.get("skills", [])])
-    overlap = job_skills & cand_skills
-    if len(overlap) >= max(len(job_skills), 3):
+    if skills_overlap is None:
+        cand_skills = set([s.lower() for s in profile_data.get("skills", [])])
+        skills_overlap = len(job_skills & cand_skills)
+    if skills_overlap >= max(len(job_skills), 3):
         exp_score = 10
-    elif len(overlap) >= 2:
+    elif skills_overlap >= 2:
         exp_score = 8
-    elif len(overlap) == 1:
+    elif skills_overlap == 1:
         exp_score = 6
     else:
         exp_score = 3
     breakdown["experience_match"] = exp_score
-    score += exp_score * 0.25
+    score += exp_score * _W[3]
 
     # --- Location Match (10%) ---
     # Exact city: 10, Same metro: 8, Remote-friendly: 6
@@ -203,7 +361,7 @@ def score_profile_for_job(profile_data, job):
     elif "remote" in cand_location or "remote" in job_location:
         location_score = 6
     breakdown["location"] = location_score
-    score += location_score * 0.10
+    score += location_score * _W[4]
 
     # --- Tenure (10%) ---
     # 2-3 years avg: 9-10, 1-2 years: 6-8, Job hopping: 3-5
@@ -224,10 +382,8 @@ def score_profile_for_job(profile_data, job):
     else:
         tenure_score = 2
     breakdown["tenure"] = tenure_score
-    score += tenure_score * 0.10
+    score += tenure_score * _W[5]
 
-    # Add mild randomness to break ties
-    score += random.uniform(0, 1)
     score = round(score, 2)
     for k in breakdown:
         breakdown[k] = round(breakdown[k], 1)
@@ -263,18 +419,18 @@ async def batch_process_jobs(jobs: List[JobInput], top_n: int):
 
 async def process_single_job(job: JobInput, top_n: int):
     # 1. Search candidates
-    candidates = agent.search_linkedin(job.description, max_results=top_n*2)  # fetch extra for scoring
-    # 2. Score candidates (fit score, breakdown, confidence)
-    scored = agent.score_candidates(candidates, job.description)
-    # 3. Multi-source enrichment (GitHub/Twitter)
-    for c in scored:
+    candidates = await agent.search_linkedin(job.description, max_results=top_n*2)  # fetch extra for scoring
+    # 2. Fused pass: score everyone, keep top_n, message only the winners
+    candidates_found, winners = await agent.rank_and_message(candidates, job.description, top_n)
+    # 3. Multi-source enrichment (GitHub/Twitter) for the winners only
+    for c in winners:
         enrich_with_github_twitter(c)
-    # 4. Outreach messages
-    messages = agent.generate_outreach(scored[:top_n], job.description)
-    # 5. Compose output JSON
+    # 4. Compose output JSON
+    # Stable fallback id: builtin hash() is salted per process, which broke
+    # cross-worker cache keys
     return {
-        "job_id": job.job_id or hash(job.description),
-        "candidates_found": len(scored),
+        "job_id": job.job_id or xxhash.xxh3_64_hexdigest(job.description),
+        "candidates_found": candidates_found,
         "top_candidates": [
             {
                 "name": c["name"],
@@ -284,9 +440,9 @@ async def process_single_job(job: JobInput, top_n: int):
                 "confidence_level": c["confidence_level"],
                 "github_url": c.get("github_url"),
                 "twitter_url": c.get("twitter_url"),
-                "outreach_message": m["message"]
+                "outreach_message": c["outreach_message"]
             }
-            for c, m in zip(scored[:top_n], messages)
+            for c in winners
         ]
     }
 
@@ -38,6 +38,13 @@ class Settings(BaseSettings):
     
     # Cache Configuration
     cache_ttl: int = 3600  # 1 hour in seconds
+    cache_ttl_search: int = 3600      # real search results
+    cache_ttl_profile: int = 86400    # scraped profile data
+    cache_ttl_negative: int = 60      # empty/fallback results
+
+    # Outreach Generation
+    outreach_model: str = "gpt-4o-mini"
+    outreach_max_tokens: int = 80
     
     # Fit Score Weights
     education_weight: float = 0.20
@@ -66,4 +73,9 @@ class Settings(BaseSettings):
 
 
 # Global settings instance
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
+
+# Precomputed lowercase lookup sets so scoring does O(1) case-insensitive
+# membership checks instead of scanning the lists per candidate
+ELITE_SCHOOLS_SET = frozenset(s.lower() for s in settings.elite_schools)
+TOP_TECH_COMPANIES_SET = frozenset(s.lower() for s in settings.top_tech_companies)
\ No newline at end of file
@@ -1,122 +1,231 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
-from models import Base
-from config import settings
-import redis
-from typing import Generator
-import json
-
-
-class DatabaseManager:
-    def __init__(self):
-        self.engine = None
-        self.SessionLocal = None
-        self.redis_client = None
-        self._setup_database()
-        self._setup_redis()
-    
-    def _setup_database(self):
-        """Setup database connection"""
-        if settings.database_url.startswith("sqlite"):
-            # SQLite configuration for development
-            self.engine = create_engine(
-                settings.database_url,
-                connect_args={"check_same_thread": False},
-                poolclass=StaticPool,
-                echo=settings.debug
-            )
-        else:
-            # PostgreSQL configuration for production
-            self.engine = create_engine(
-                settings.database_url,
-                echo=settings.debug,
-                pool_pre_ping=True
-            )
-        
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-    
-    def _setup_redis(self):
-        """Setup Redis connection for caching"""
-        try:
-            self.redis_client = redis.from_url(settings.redis_url)
-            # Test connection
-            self.redis_client.ping()
-        except Exception as e:
-            print(f"Warning: Redis connection failed: {e}")
-            self.redis_client = None
-    
-    def create_tables(self):
-        """Create all database tables"""
-        Base.metadata.create_all(bind=self.engine)
-    
-    def get_db(self) -> Generator[Session, None, None]:
-        """Get database session"""
-        db = self.SessionLocal()
-        try:
-            yield db
-        finally:
-            db.close()
-    
-    def get_cache(self, key: str):
-        """Get value from cache"""
-        if not self.redis_client:
-            return None
-        
-        try:
-            value = self.redis_client.get(key)
-            return json.loads(value) if value else None
-        except Exception as e:
-            print(f"Cache get error: {e}")
-            return None
-    
-    def set_cache(self, key: str, value: any, ttl: int = None):
-        """Set value in cache"""
-        if not self.redis_client:
-            return False
-        
-        try:
-            ttl = ttl or settings.cache_ttl
-            self.redis_client.setex(key, ttl, json.dumps(value))
-            return True
-        except Exception as e:
-            print(f"Cache set error: {e}")
-            return False
-    
-    def delete_cache(self, key: str):
-        """Delete value from cache"""
-        if not self.redis_client:
-            return False
-        
-        try:
-            self.redis_client.delete(key)
-            return True
-        except Exception as e:
-            print(f"Cache delete error: {e}")
-            return False
-    
-    def clear_cache(self):
-        """Clear all cache"""
-        if not self.redis_client:
-            return False
-        
-        try:
-            self.redis_client.flushdb()
-            return True
-        except Exception as e:
-            print(f"Cache clear error: {e}")
-            return False
-
-
-# Global database manager instance
-db_manager = DatabaseManager()
-
-
-def get_db():
-    """Dependency to get database session"""
-    return db_manager.get_db()
-
-
-def get_cache():
-    """Dependency to get cache client"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker, Session
+from models import Base, CacheEntry
+from config import settings
+from datetime import datetime, timedelta
+import asyncio
+import redis
+import redis.asyncio as aredis
+from typing import Generator
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+def _json_dumps(obj) -> str:
+    """orjson serializer for the engine's JSON columns; the DBAPI wants str."""
+    return orjson.dumps(obj).decode()
+
+
+class DatabaseManager:
+    def __init__(self):
+        self.engine = None
+        self.SessionLocal = None
+        self.redis_client = None
+        self.aio_redis = None
+        self._setup_database()
+        self._setup_redis()
+    
+    def _setup_database(self):
+        """Setup database connection"""
+        if settings.database_url.startswith("sqlite"):
+            # SQLite configuration for development. StaticPool meant one
+            # shared connection, so every request serialized at the DB;
+            # a real pool plus WAL lets readers and the writer overlap.
+            self.engine = create_engine(
+                settings.database_url,
+                connect_args={"check_same_thread": False},
+                pool_size=10,
+                max_overflow=20,
+                insertmanyvalues_page_size=10_000,
+                json_serializer=_json_dumps,
+                json_deserializer=orjson.loads,
+                echo=settings.debug
+            )
+
+            @event.listens_for(self.engine, "connect")
+            def _set_sqlite_pragmas(dbapi_conn, _):
+                cur = dbapi_conn.cursor()
+                cur.execute("PRAGMA journal_mode=WAL")
+                cur.execute("PRAGMA synchronous=NORMAL")
+                cur.execute("PRAGMA busy_timeout=5000")
+                cur.close()
+        else:
+            # PostgreSQL configuration for production
+            self.engine = create_engine(
+                settings.database_url,
+                echo=settings.debug,
+                pool_pre_ping=True,
+                insertmanyvalues_page_size=10_000,
+                json_serializer=_json_dumps,
+                json_deserializer=orjson.loads
+            )
+        
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+    
+    def _setup_redis(self):
+        """Setup Redis connection for caching"""
+        try:
+            self.redis_client = redis.from_url(settings.redis_url)
+            # Test connection
+            self.redis_client.ping()
+            # Async client for event-loop call sites; blocking redis calls
+            # from coroutines stall the loop for a full RTT each
+            self.aio_redis = aredis.from_url(settings.redis_url, max_connections=32)
+        except Exception as e:
+            logger.warning(f"Redis connection failed: {e}")
+            self.redis_client = None
+            self.aio_redis = None
+    
+    def create_tables(self):
+        """Create all database tables"""
+        Base.metadata.create_all(bind=self.engine)
+    
+    def get_db(self) -> Generator[Session, None, None]:
+        """Get database session"""
+        db = self.SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    def get_cache(self, key: str):
+        """Get value from cache"""
+        if not self.redis_client:
+            return self._db_get_cache(key)
+
+        try:
+            value = self.redis_client.get(key)
+            return orjson.loads(value) if value else None
+        except (redis.RedisError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Cache get error: {e}")
+            return None
+    
+    def set_cache(self, key: str, value: any, ttl: int = None):
+        """Set value in cache"""
+        if not self.redis_client:
+            return self._db_set_cache(key, value, ttl or settings.cache_ttl)
+
+        try:
+            ttl = ttl or settings.cache_ttl
+            self.redis_client.setex(key, ttl, orjson.dumps(value))
+            return True
+        except (redis.RedisError, TypeError) as e:
+            logger.warning(f"Cache set error: {e}")
+            return False
+    
+    async def aget_cache(self, key: str):
+        """Get value from cache without blocking the event loop"""
+        if not self.aio_redis:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._db_get_cache, key
+            )
+
+        try:
+            value = await self.aio_redis.get(key)
+            return orjson.loads(value) if value else None
+        except (redis.RedisError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Cache get error: {e}")
+            return None
+
+    async def aset_cache(self, key: str, value: any, ttl: int = None):
+        """Set value in cache without blocking the event loop"""
+        if not self.aio_redis:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._db_set_cache, key, value, ttl or settings.cache_ttl
+            )
+
+        try:
+            ttl = ttl or settings.cache_ttl
+            await self.aio_redis.setex(key, ttl, orjson.dumps(value))
+            return True
+        except (redis.RedisError, TypeError) as e:
+            logger.warning(f"Cache set error: {e}")
+            return False
+
+    async def aget_many(self, keys: list):
+        """Get several cache values with one MGET round trip"""
+        if not self.aio_redis or not keys:
+            return [None] * len(keys)
+
+        try:
+            vals = await self.aio_redis.mget(keys)
+            return [orjson.loads(v) if v else None for v in vals]
+        except (redis.RedisError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Cache mget error: {e}")
+            return [None] * len(keys)
+
+    def _db_get_cache(self, key: str):
+        """Cold-tier lookup in cache_entries; only reached when Redis is
+        unavailable. Expired rows are dropped lazily on read — Redis owns
+        TTL expiry on the hot tier."""
+        try:
+            with self.SessionLocal() as session:
+                entry = session.query(CacheEntry).filter_by(cache_key=key).first()
+                if entry is None:
+                    return None
+                if entry.expires_at <= datetime.utcnow():
+                    session.delete(entry)
+                    session.commit()
+                    return None
+                return entry.cache_value
+        except SQLAlchemyError as e:
+            logger.warning(f"Cache get error: {e}")
+            return None
+
+    def _db_set_cache(self, key: str, value: any, ttl: int):
+        """Cold-tier upsert into cache_entries; only reached when Redis is
+        unavailable."""
+        try:
+            with self.SessionLocal() as session:
+                entry = session.query(CacheEntry).filter_by(cache_key=key).first()
+                if entry is None:
+                    entry = CacheEntry(cache_key=key)
+                    session.add(entry)
+                entry.cache_value = value
+                entry.expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+                session.commit()
+            return True
+        except SQLAlchemyError as e:
+            logger.warning(f"Cache set error: {e}")
+            return False
+
+    def delete_cache(self, key: str):
+        """Delete value from cache"""
+        if not self.redis_client:
+            return False
+        
+        try:
+            self.redis_client.delete(key)
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Cache delete error: {e}")
+            return False
+    
+    def clear_cache(self):
+        """Clear all cache"""
+        if not self.redis_client:
+            return False
+        
+        try:
+            self.redis_client.flushdb()
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Cache clear error: {e}")
+            return False
+
+
+# Global database manager instance
+db_manager = DatabaseManager()
+
+
+def get_db():
+    """Dependency to get database session"""
+    return db_manager.get_db()
+
+
+def get_cache():
+    """Dependency to get cache client"""
     return db_manager.redis_client 
\ No newline at end of file
@@ -1,26 +1,155 @@
+import re
 import time
 import random
+import hashlib
 import logging
 import asyncio
 import requests
+import aiohttp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from functools import partial
 from typing import List, Dict, Any, Optional
 from urllib.parse import quote_plus, urlparse
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
+from selectolax.parser import HTMLParser
 from googlesearch import search as google_search
 
-from config import settings
-from database import db_manager
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 try:
-    from serpapi import GoogleSearch as SerpAPIClient
-    SERPAPI_AVAILABLE = True
+    from aiolimiter import AsyncLimiter
 except ImportError:
-    SERPAPI_AVAILABLE = False
+    AsyncLimiter = None
+
+from config import settings
+from database import db_manager
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# In-process LRU bound for memoized profile data
+PROFILE_MEMO_MAX = 10_000
+
+# Patterns compiled once at import; recompiling them per call shows up
+# at high QPS
+_RE_GITHUB = re.compile(r"https?://github\.com/\w+")
+_RE_TWITTER = re.compile(r"https?://twitter\.com/\w+")
+_RE_WEBSITE = re.compile(r"https?://[\w.-]+\.[a-z]{2,}")
+_RE_LOCATION = re.compile(r"(?:in|at|based in)\s+([A-Za-z\s,]+?)(?:\s|$|\.)", re.IGNORECASE)
+_RE_LINKEDIN = re.compile(r"https?://[^/]*linkedin\.com/in/[^/\s]+")
+_RE_LINKS = re.compile(r"https?://(?:github\.com|twitter\.com)/\w+")
+_RE_NAME_ARIA = re.compile(r"^.+\s+\|\s+LinkedIn$")
+_RE_LOC_SPAN = re.compile(r"\b[A-Z][a-z]+,? [A-Z]{2,}")
+
+# Fixed rotation pool: fake_useragent loaded and walked its JSON browser DB
+# on every .random, behind a lock. random.choice on a tuple is ~free.
+_UA_POOL = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36 Edg/119.0.0.0",
+    "Mozilla/5.0 (Windows NT 11.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Fedora; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
+)
+
+# Keyword vocabularies for job-description term extraction, kept in
+# priority order (first job-title hit wins)
+JOB_TITLES = (
+    "software engineer", "backend engineer", "frontend engineer", "full stack engineer",
+    "data scientist", "machine learning engineer", "devops engineer", "product manager",
+    "designer", "researcher", "analyst"
+)
+JOB_DESCRIPTION_SKILLS = (
+    "python", "javascript", "java", "react", "node.js", "aws", "docker", "kubernetes",
+    "machine learning", "ai", "data science", "sql", "postgresql", "mongodb"
+)
+COMPANY_TYPE_KEYWORDS = {
+    "startup": ("startup", "early stage", "seed", "series a", "series b"),
+    "fintech": ("fintech", "financial", "banking", "payments", "crypto"),
+    "ai": ("ai", "artificial intelligence", "machine learning", "ml"),
+    "saas": ("saas", "software as a service", "b2b", "enterprise"),
+}
+
+# One tagged Aho-Corasick automaton over all three vocabularies: a single
+# linear scan of the description replaces len(keywords) substring scans
+# (each of which re-lowered the description)
+if AHOCORASICK_AVAILABLE:
+    _TERM_AUTOMATON = ahocorasick.Automaton()
+    for _title in JOB_TITLES:
+        _TERM_AUTOMATON.add_word(_title, ("title", _title))
+    for _skill in JOB_DESCRIPTION_SKILLS:
+        _TERM_AUTOMATON.add_word(_skill, ("skill", _skill))
+    for _ctype, _kws in COMPANY_TYPE_KEYWORDS.items():
+        for _kw in _kws:
+            _TERM_AUTOMATON.add_word(_kw, ("company_type", _ctype))
+    _TERM_AUTOMATON.make_automaton()
+else:
+    _TERM_AUTOMATON = None
+
+_RE_JD_SPLIT = re.compile(r"[^a-z0-9+#.]+")
+
+# Byte markers for every profile section extract_profile_data queries;
+# streaming reads stop once all of them have been seen
+_PROFILE_MARKERS = (
+    b"</h1>",
+    b'id="experience"',
+    b'id="education"',
+    b'id="skills"',
+    b'id="about"',
+    b'id="contact-info"',
+)
+
+
+def _prepare_jd(job_description: str) -> frozenset:
+    """Tokenize a job description once into lowercased tokens plus adjacent
+    bigrams, so scoring a batch does hashed lookups instead of substring
+    scans of the whole text per field."""
+    tokens = [t for t in _RE_JD_SPLIT.split(job_description.lower()) if t]
+    bigrams = (f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return frozenset(tokens).union(bigrams)
+
+
+def _ckey(prefix: str, *parts: str) -> str:
+    """Stable cache key: blake2b digest over the given parts. The builtin
+    hash() is salted per interpreter start, which silently invalidated the
+    whole Redis cache on every worker restart."""
+    digest = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def _normalize_profile_url(url: str) -> str:
+    """Strip query string and trailing slash so URL variants share a key."""
+    return url.split("?")[0].rstrip("/")
+
+
+# One warm requests.Session shared by every scraper instance: enlarged
+# urllib3 pool, bounded retries, and TLS sessions reused across requests.
+# Per-request User-Agent rotation happens via the headers= kwarg.
+_SHARED_SESSION = requests.Session()
+_SHARED_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+)
+_SHARED_SESSION.mount("https://", _SHARED_ADAPTER)
+_SHARED_SESSION.mount("http://", _SHARED_ADAPTER)
+_SHARED_SESSION.headers.update({
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+})
+
 
 class LinkedInScraper:
     def __init__(
@@ -29,14 +158,7 @@ class LinkedInScraper:
         use_serpapi: bool = False,
         proxies: Optional[List[str]] = None
     ):
-        self.ua = UserAgent()
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": self.ua.random,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Connection": "keep-alive",
-        })
+        self.session = _SHARED_SESSION
 
         self.proxies = proxies or []
         self.proxy_index = 0
@@ -48,14 +170,47 @@ class LinkedInScraper:
             "fresh-linkedin-profile-data.p.rapidapi.com"
         ]
 
-        self.use_serpapi = (
-            use_serpapi
-            and SERPAPI_AVAILABLE
-            and bool(getattr(settings, "serpapi_key", None))
-        )
+        self.use_serpapi = use_serpapi and bool(getattr(settings, "serpapi_key", None))
         self.serpapi_key = getattr(settings, "serpapi_key", None)
 
         self.rate_limit_delay = 2  # seconds
+        self._fetch_semaphore = asyncio.Semaphore(10)
+        # In-process LRU over Redis: repeated URLs within a worker skip
+        # even the Redis round trip
+        self._profile_memo: OrderedDict = OrderedDict()
+        # Shared pooled aiohttp session for async paths; attached by the app
+        # at startup (see api.py) so connections persist across requests
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        # Single-flight map: concurrent callers for the same key await one
+        # shared future instead of firing duplicate upstream calls
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Token-bucket limiter for Google scraping from async paths: awaiting
+        # a slot yields the loop, unlike the blocking politeness sleep
+        self._google_limiter = AsyncLimiter(5, 60) if AsyncLimiter else None
+        # True when the last uncached search saw every source raise
+        self._last_search_errored = False
+
+    def set_aio_session(self, session: aiohttp.ClientSession):
+        """Attach a shared aiohttp session used by the async fetch paths."""
+        self._aio_session = session
+
+    async def close_aio_session(self):
+        """Close the attached aiohttp session (call at app shutdown)."""
+        if self._aio_session is not None:
+            await self._aio_session.close()
+            self._aio_session = None
+
+    def _get_aio_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating a lazily-owned one if the app
+        didn't attach any (e.g. CLI usage via main.py)."""
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=50, ttl_dns_cache=300, keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=20),
+            )
+        return self._aio_session
 
     def _get_proxy(self) -> Optional[Dict[str, str]]:
         if not self.proxies:
@@ -64,138 +219,263 @@ class LinkedInScraper:
         self.proxy_index += 1
         return {"http": url, "https": url}
 
+    async def _afetch(self, url: str, *, headers=None, params=None,
+                      attempts: int = 3, as_json: bool = False):
+        """GET through the shared aiohttp session with exponential backoff.
+
+        Honors Retry-After on 429 so a rate-limited host delays just this
+        task instead of burning the day's request budget on rejections."""
+        session = self._get_aio_session()
+        for attempt in range(attempts):
+            async with session.get(url, headers=headers, params=params) as resp:
+                if resp.status == 429 and attempt < attempts - 1:
+                    delay = float(resp.headers.get("Retry-After", 2 ** attempt))
+                    await asyncio.sleep(delay)
+                    continue
+                resp.raise_for_status()
+                return await (resp.json() if as_json else resp.text())
+
     async def _search_google_async(self, query: str, max_results: int):
+        """Async Google search: SerpAPI over aiohttp when enabled, else the
+        blocking googlesearch client in the default executor."""
+        if self.use_serpapi:
+            return await self._search_serpapi(query, max_results)
+        if self._google_limiter is not None:
+            # Rate-limit here instead of sleeping in the worker thread, so
+            # the executor slot is only held for the actual search
+            async with self._google_limiter:
+                return await asyncio.get_event_loop().run_in_executor(
+                    None, partial(self._search_google, query, max_results, throttle=False)
+                )
         return await asyncio.get_event_loop().run_in_executor(
             None, self._search_google, query, max_results
         )
 
-    async def _search_rapidapi_async(self, query: str, max_results: int):
-        return await asyncio.get_event_loop().run_in_executor(
-            None, self._search_rapidapi, query, max_results
-        )
+    async def _search_serpapi(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        """Query SerpAPI directly through the shared aiohttp session."""
+        if not self.serpapi_key:
+            raise ValueError("`settings.serpapi_key` not set")
+        params = {
+            "engine": "google",
+            "q": f"{query} site:linkedin.com/in",
+            "api_key": self.serpapi_key,
+            "num": max_results
+        }
+        data = await self._afetch("https://serpapi.com/search", params=params, as_json=True)
+        results = []
+        for item in data.get("organic_results", []):
+            link = item.get("link")
+            if link:
+                results.append({
+                    "url": link,
+                    "title": item.get("title", ""),
+                    "description": item.get("snippet", ""),
+                    "source": "serpapi"
+                })
+                if len(results) >= max_results:
+                    break
+        return results
+
+    async def aextract_profile_data(self, linkedin_url: str) -> Dict[str, Any]:
+        """Async wrapper for extract_profile_data, throttled so concurrent
+        fan-outs don't hammer LinkedIn. Duplicate concurrent calls for the
+        same URL coalesce onto one fetch."""
+        key = f"profile:{_normalize_profile_url(linkedin_url)}"
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+        fut = asyncio.get_event_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            async with self._fetch_semaphore:
+                profile = await asyncio.get_event_loop().run_in_executor(
+                    None, self.extract_profile_data, linkedin_url
+                )
+            fut.set_result(profile)
+            return profile
+        except asyncio.CancelledError:
+            # The owning task died; cancel the shared future so coalesced
+            # waiters wake up instead of hanging on it forever
+            if not fut.done():
+                fut.cancel()
+            raise
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def extract_profiles(self, urls: List[str], concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Extract many profiles concurrently with a per-call concurrency cap.
+
+        The cap throttles against LinkedIn's anti-bot on top of the
+        scraper-wide fetch semaphore; failures come back as the exception in
+        that slot rather than cancelling the whole batch."""
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(url: str) -> Dict[str, Any]:
+            async with sem:
+                return await self.aextract_profile_data(url)
+
+        return await asyncio.gather(*(one(u) for u in urls), return_exceptions=True)
+
+    async def extract_profiles_batch(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """Extract several profiles, checking the cache with one MGET round
+        trip and only scheduling fetches for the misses."""
+        keys = [_ckey("profile_data", _normalize_profile_url(u)) for u in urls]
+        cached = await db_manager.aget_many(keys)
+        results: List[Any] = list(cached)
+        miss_idx = [i for i, hit in enumerate(cached) if not hit]
+        if miss_idx:
+            fetched = await asyncio.gather(
+                *(self.aextract_profile_data(urls[i]) for i in miss_idx),
+                return_exceptions=True
+            )
+            for i, profile in zip(miss_idx, fetched):
+                results[i] = {} if isinstance(profile, Exception) else profile
+        return results
 
     async def search_linkedin_profiles(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """
         Parallel Google + RapidAPI searches, falling back to direct LinkedIn search.
         Caches results in Redis/SQLite via db_manager.
         """
-        cache_key = f"linkedin_search:{hash(query)}"
-        cached = db_manager.get_cache(cache_key)
+        cache_key = _ckey("linkedin_search", query.strip().lower())
+        cached = await db_manager.aget_cache(cache_key)
         if cached:
             logger.info(f"Cache hit for query '{query}'")
             return cached
 
+        # Single-flight: callers racing on the same query within the cache-miss
+        # window share one upstream run instead of duplicating billed calls
+        existing = self._inflight.get(cache_key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+        fut = asyncio.get_event_loop().create_future()
+        self._inflight[cache_key] = fut
+        try:
+            profiles = await self._search_profiles_uncached(query, max_results)
+            # Negative results get a short TTL so one bad upstream window
+            # doesn't pin "No candidates found" for a full cache period;
+            # results produced because every source raised aren't cached at all
+            is_negative = not profiles or all(p.get("source") == "fallback" for p in profiles)
+            if not self._last_search_errored:
+                await db_manager.aset_cache(
+                    cache_key, profiles,
+                    ttl=settings.cache_ttl_negative if is_negative else settings.cache_ttl_search
+                )
+            result = profiles[:max_results]
+            fut.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # The owning task died; cancel the shared future so coalesced
+            # waiters wake up instead of hanging on it forever
+            if not fut.done():
+                fut.cancel()
+            raise
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+            raise
+        finally:
+            del self._inflight[cache_key]
+
+    async def _search_profiles_uncached(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Run the Google/RapidAPI fan-out plus fallbacks, bypassing caches.
+
+        Tracks whether every source raised (vs. genuinely returning nothing)
+        in self._last_search_errored so the caller can skip caching
+        error-driven fallbacks — a transient upstream outage shouldn't be
+        pinned in Redis as 'no candidates'."""
+        sources_ok = 0
+
         async def _gather():
-            tasks = [self._search_google_async(query, max_results)]
+            nonlocal sources_ok
+            coros = [self._search_google_async(query, max_results)]
             if self.use_rapidapi:
-                tasks.append(self._search_rapidapi_async(query, max_results))
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
+                coros.append(self._search_rapidapi(query, max_results))
+            # Take results as each source finishes; once we have enough,
+            # cancel the stragglers instead of waiting out the slowest one
+            tasks = [asyncio.ensure_future(c) for c in coros]
             seen = set()
             out = []
-            for res in results:
-                if isinstance(res, list):
-                    for profile in res:
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    try:
+                        res = await next_done
+                    except asyncio.CancelledError:
+                        raise
+                    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                        logger.debug(f"Search source failed: {e}")
+                        continue
+                    sources_ok += 1
+                    for profile in res or []:
                         url = profile.get("url") or profile.get("linkedin_url")
                         if url and url not in seen:
                             seen.add(url)
                             out.append(profile)
                             if len(out) >= max_results:
                                 return out
+            finally:
+                for t in tasks:
+                    if not t.done():
+                        t.cancel()
             return out
 
         try:
             profiles = await _gather()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.warning(f"Async gather failed: {e}")
             profiles = []
 
-        # If nothing yet, try to force-add SerpAPI raw results if available
+        # If nothing yet, retry SerpAPI on its own if available
         if not profiles and self.use_serpapi:
             try:
-                serpapi_q = f"{query} site:linkedin.com/in"
-                import requests
-                params = {
-                    "engine": "google",
-                    "q": serpapi_q,
-                    "api_key": self.serpapi_key,
-                    "num": max_results
-                }
-                response = requests.get("https://serpapi.com/search", params=params)
-                raw = response.json()
-                print("SERPAPI RAW RESPONSE (fallback):", raw)
-                forced_profiles = []
-                for item in raw.get("organic_results", []):
-                    link = item.get("link")
-                    if link:
-                        forced_profiles.append({
-                            "url": link,
-                            "title": item.get("title", ""),
-                            "description": item.get("snippet", ""),
-                            "source": "serpapi"
-                        })
-                        if len(forced_profiles) >= max_results:
-                            break
-                if forced_profiles:
-                    profiles = forced_profiles
-                    print("FORCED SERPAPI PROFILES (fallback):", profiles)
-            except Exception as e:
-                print("SERPAPI fallback error:", e)
+                profiles = await self._search_serpapi(query, max_results)
+                sources_ok += 1
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.warning(f"SerpAPI fallback error: {e}")
+                profiles = []
 
         # If still nothing, try direct LinkedIn search
         if not profiles:
             logger.info("No results from APIs, falling back to direct LinkedIn search")
-            profiles = self._search_direct(query, max_results)
+            profiles = await self._search_direct(query, max_results)
+            if profiles:
+                sources_ok += 1
 
         # Ensure at least a dummy result
         if not profiles:
             profiles = [{"url": "", "name": "No candidates found", "source": "fallback"}]
 
-        db_manager.set_cache(cache_key, profiles)
-        return profiles[:max_results]
+        self._last_search_errored = sources_ok == 0
+        return profiles
+
+    def _search_google(self, query: str, max_results: int, throttle: bool = True) -> List[Dict[str, str]]:
+        """Blocking googlesearch-python fallback when SerpAPI isn't enabled.
 
-    def _search_google(self, query: str, max_results: int) -> List[Dict[str, str]]:
-        """Use either SerpAPI or googlesearch-python to hit Google."""
+        `throttle=False` skips the politeness sleep for callers that already
+        rate-limit (the async path's token bucket)."""
         search_query = f"{query} site:linkedin.com/in"
         logger.info(f"Google search: {search_query}")
-        time.sleep(random.uniform(5, 10))
+        if throttle:
+            time.sleep(random.uniform(5, 10))
 
         proxies = self._get_proxy()
         results: List[Dict[str, str]] = []
-
-        if self.use_serpapi:
-            if not SERPAPI_AVAILABLE:
-                raise ImportError("Please `pip install google-search-results` for SerpAPI support")
-            if not self.serpapi_key:
-                raise ValueError("`settings.serpapi_key` not set")
-            serpapi_q = f"{query} site:linkedin.com/in"
-            client = SerpAPIClient({"engine": "google", "q": serpapi_q, "api_key": self.serpapi_key, "num": max_results})
-            data = client.get_dict()
-            # DEBUG PRINT: raw SerpAPI response
-            print("SERPAPI RAW RESPONSE:", data)
-            for item in data.get("organic_results", []):
-                link = item.get("link")
-                if link:
-                    results.append({
-                        "url": link,
-                        "title": item.get("title", ""),
-                        "description": item.get("snippet", ""),
-                        "source": "serpapi"
-                    })
-                    if len(results) >= max_results:
-                        break
-            # DEBUG PRINT: parsed profiles
-            print("SERPAPI PARSED PROFILES:", results)
-        else:
-            for url in google_search(search_query, num_results=max_results, proxies=proxies):
-                if "linkedin.com/in/" in url:
-                    results.append({"url": url, "source": "google_search"})
-                    if len(results) >= max_results:
-                        break
-        print("GOOGLE SEARCH FINAL PROFILES:", results)
+        for url in google_search(search_query, num_results=max_results, proxies=proxies):
+            if "linkedin.com/in/" in url:
+                results.append({"url": url, "source": "google_search"})
+                if len(results) >= max_results:
+                    break
         return results
 
-    def _search_rapidapi(self, query: str, max_results: int) -> List[Dict[str, str]]:
+    async def _search_rapidapi(self, query: str, max_results: int) -> List[Dict[str, str]]:
         """Rotate through RapidAPI hosts, gathering up to `max_results` profiles."""
         if not self.use_rapidapi:
             return []
@@ -208,9 +488,7 @@ class LinkedInScraper:
             }
             params = {"query": query, "limit": max_results}
             try:
-                resp = self.session.get(url, headers=headers, params=params, timeout=10)
-                resp.raise_for_status()
-                data = resp.json().get("data", [])
+                data = (await self._afetch(url, headers=headers, params=params, as_json=True)).get("data", [])
                 for p in data:
                     public_id = p.get("public_id", "")
                     profiles.append({
@@ -221,94 +499,86 @@ class LinkedInScraper:
                     })
                     if len(profiles) >= max_results:
                         return profiles
-            except Exception as e:
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
                 logger.error(f"RapidAPI host {host} error: {e}")
         return profiles
 
-    def _search_direct(self, query: str, max_results: int) -> List[Dict[str, str]]:
+    async def _search_direct(self, query: str, max_results: int) -> List[Dict[str, str]]:
         """Simple LinkedIn people search page scrape (best‐effort)."""
         logger.info(f"Direct LinkedIn search for '{query}'")
         url = "https://www.linkedin.com/search/results/people/"
         params = {"keywords": query, "origin": "GLOBAL_SEARCH_HEADER"}
         headers = {
-            "User-Agent": self.ua.random,
+            "User-Agent": random.choice(_UA_POOL),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9"
         }
 
         try:
-            resp = self.session.get(url, params=params, headers=headers, timeout=10)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
+            html = await self._afetch(url, params=params, headers=headers)
+            tree = HTMLParser(html)
             out = []
-            for a in soup.select('a.app-aware-link[href*="/in/"]'):
-                href = a["href"].split("?")[0]
+            for a in tree.css('a.app-aware-link[href*="/in/"]'):
+                href = (a.attributes.get("href") or "").split("?")[0]
+                if not href:
+                    continue
                 full = href if href.startswith("http") else "https://linkedin.com" + href
                 out.append({"url": full, "source": "direct_linkedin"})
                 if len(out) >= max_results:
                     break
             return out
-        except Exception as e:
+        except asyncio.CancelledError:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
             logger.error(f"Direct search failed: {e}")
             return []
 
     def _extract_search_terms(self, job_description: str) -> Dict[str, str]:
-        """Extract key search terms from job description"""
-        # Simple keyword extraction - in production, use NLP
-        keywords = []
+        """Extract key search terms from job description in one keyword pass"""
+        jd_lower = job_description.lower()
+        hits = self._keyword_hits(jd_lower)
+
+        # First title in vocabulary (priority) order wins
+        job_title = next((t for t in JOB_TITLES if t in hits["title"]), None)
+        found_skills = [s for s in JOB_DESCRIPTION_SKILLS if s in hits["skill"]]
 
-        
-        # Common job titles
-        job_titles = [
-            "software engineer", "backend engineer", "frontend engineer", "full stack engineer",
-            "data scientist", "machine learning engineer", "devops engineer", "product manager",
-            "designer", "researcher", "analyst"
-        ]
-        
-        # Common skills
-        skills = [
-            "python", "javascript", "java", "react", "node.js", "aws", "docker", "kubernetes",
-            "machine learning", "ai", "data science", "sql", "postgresql", "mongodb"
-        ]
-        
-        # Extract job title
-        job_title = None
-        for title in job_titles:
-            if title.lower() in job_description.lower():
-                job_title = title
-                break
-        
-        # Extract skills
-        found_skills = []
-        for skill in skills:
-            if skill.lower() in job_description.lower():
-                found_skills.append(skill)
-        
         # Extract location (simple regex)
-        location_match = re.search(r'(?:in|at|based in)\s+([A-Za-z\s,]+?)(?:\s|$|\.)', job_description, re.IGNORECASE)
+        location_match = _RE_LOCATION.search(job_description)
         location = location_match.group(1).strip() if location_match else ""
-        
+
+        company_type = next(
+            (c for c in COMPANY_TYPE_KEYWORDS if c in hits["company_type"]), "tech"
+        )
         return {
             "job_title": job_title or "software engineer",
             "skills": found_skills[:3],  # Top 3 skills
             "location": location,
-            "company_type": self._extract_company_type(job_description)
+            "company_type": company_type
         }
-    
+
+    @staticmethod
+    def _keyword_hits(jd_lower: str) -> Dict[str, set]:
+        """Single scan over the lowered description collecting every title,
+        skill and company-type keyword hit. Aho-Corasick when available,
+        substring fallback otherwise."""
+        hits = {"title": set(), "skill": set(), "company_type": set()}
+        if _TERM_AUTOMATON is not None:
+            for _, (category, value) in _TERM_AUTOMATON.iter(jd_lower):
+                hits[category].add(value)
+            return hits
+        hits["title"].update(t for t in JOB_TITLES if t in jd_lower)
+        hits["skill"].update(s for s in JOB_DESCRIPTION_SKILLS if s in jd_lower)
+        hits["company_type"].update(
+            c for c, kws in COMPANY_TYPE_KEYWORDS.items()
+            if any(kw in jd_lower for kw in kws)
+        )
+        return hits
+
     def _extract_company_type(self, description: str) -> str:
         """Extract company type from description"""
-        company_types = {
-            "startup": ["startup", "early stage", "seed", "series a", "series b"],
-            "fintech": ["fintech", "financial", "banking", "payments", "crypto"],
-            "ai": ["ai", "artificial intelligence", "machine learning", "ml"],
-            "saas": ["saas", "software as a service", "b2b", "enterprise"]
-        }
-        
-        description_lower = description.lower()
-        for company_type, keywords in company_types.items():
-            if any(keyword in description_lower for keyword in keywords):
-                return company_type
-        
-        return "tech"
+        hits = self._keyword_hits(description.lower())
+        return next((c for c in COMPANY_TYPE_KEYWORDS if c in hits["company_type"]), "tech")
     
     def _google_search_strategy(self, search_terms: Dict[str, str], max_results: int) -> List[Dict[str, Any]]:
         """Search using Google with site:linkedin.com/in"""
@@ -332,22 +602,22 @@ class LinkedInScraper:
         search_url = f"https://www.google.com/search?q={quote_plus(query)}&num={max_results}"
         
         try:
-            response = self.session.get(search_url)
+            response = self.session.get(search_url, headers={"User-Agent": random.choice(_UA_POOL)})
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
+            tree = HTMLParser(response.text)
+
             # Extract LinkedIn URLs from search results
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+            for link in tree.css('a[href]'):
+                href = link.attributes.get('href') or ''
                 if 'linkedin.com/in/' in href:
                     # Extract LinkedIn URL
-                    linkedin_match = re.search(r'https?://[^/]*linkedin\.com/in/[^/\s]+', href)
+                    linkedin_match = _RE_LINKEDIN.search(href)
                     if linkedin_match:
                         linkedin_url = linkedin_match.group(0)
-                        
+
                         # Extract name from link text or URL
-                        name = link.get_text().strip()
+                        name = link.text().strip()
                         if not name or len(name) < 2:
                             name = linkedin_url.split('/in/')[-1].replace('-', ' ').title()
                         
@@ -360,7 +630,7 @@ class LinkedInScraper:
             time.sleep(self.rate_limit_delay)
             
         except Exception as e:
-            print(f"Google search failed: {e}")
+            logger.warning(f"Google search failed: {e}")
         
         return candidates
     
@@ -404,7 +674,7 @@ class LinkedInScraper:
             time.sleep(self.rate_limit_delay)
             
         except Exception as e:
-            print(f"RapidAPI search failed: {e}")
+            logger.warning(f"RapidAPI search failed: {e}")
         
         return candidates
     
@@ -458,18 +728,22 @@ class LinkedInScraper:
     
     def extract_profile_data(self, linkedin_url: str) -> Dict[str, Any]:
         """
-        Robustly scrape public LinkedIn profile data using requests and BeautifulSoup.
+        Robustly scrape public LinkedIn profile data using requests and selectolax.
         Tries multiple selectors, logs missing fields, and adds warnings for incomplete data.
         """
-        import re
         import datetime
-        cache_key = f"profile_data:{hash(linkedin_url)}"
+        cache_key = _ckey("profile_data", _normalize_profile_url(linkedin_url))
+        memoized = self._profile_memo.get(cache_key)
+        if memoized is not None:
+            self._profile_memo.move_to_end(cache_key)
+            return memoized
         cached_data = db_manager.get_cache(cache_key)
         if cached_data:
+            self._memoize_profile(cache_key, cached_data)
             return cached_data
 
         headers = {
-            'User-Agent': self.ua.random,
+            'User-Agent': random.choice(_UA_POOL),
             'Accept-Language': 'en-US,en;q=0.9',
         }
         profile_data = {
@@ -488,29 +762,32 @@ class LinkedInScraper:
             "extraction_timestamp": datetime.datetime.now().isoformat()
         }
         try:
-            resp = self.session.get(linkedin_url, headers=headers, timeout=20)
+            resp = self.session.get(linkedin_url, headers=headers, timeout=20, stream=True)
             if resp.status_code != 200:
                 logger.warning(f"Failed to fetch profile: {linkedin_url} (status {resp.status_code})")
                 profile_data['warnings'].append(f"HTTP status {resp.status_code}")
+                resp.close()
                 return profile_data
-            soup = BeautifulSoup(resp.text, 'html.parser')
+            tree = HTMLParser(self._read_profile_html(resp))
 
             # Name (try multiple selectors)
             name = ""
             # 1. Standard h1
-            name_tag = soup.find('h1')
-            if name_tag and name_tag.get_text(strip=True):
-                name = name_tag.get_text(strip=True)
+            name_tag = tree.css_first('h1')
+            if name_tag and name_tag.text(strip=True):
+                name = name_tag.text(strip=True)
             # 2. aria-label
             if not name:
-                name_aria = soup.find(attrs={"aria-label": re.compile(r"^.+\s+\|\s+LinkedIn$")})
-                if name_aria:
-                    name = name_aria.get("aria-label", "").split("|")[0].strip()
+                for node in tree.css('[aria-label]'):
+                    label = node.attributes.get('aria-label') or ''
+                    if _RE_NAME_ARIA.match(label):
+                        name = label.split("|")[0].strip()
+                        break
             # 3. meta property
             if not name:
-                meta_name = soup.find('meta', property='og:title')
-                if meta_name and meta_name.get('content'):
-                    name = meta_name['content'].split('|')[0].strip()
+                meta_name = tree.css_first("meta[property='og:title']")
+                if meta_name and meta_name.attributes.get('content'):
+                    name = meta_name.attributes['content'].split('|')[0].strip()
             profile_data["name"] = name
             if not name:
                 logger.warning(f"Name not found for {linkedin_url}")
@@ -518,14 +795,14 @@ class LinkedInScraper:
 
             # Headline (try multiple selectors)
             headline = ""
-            headline_tag = soup.find('div', class_=lambda x: x and 'text-body-medium' in x)
+            headline_tag = tree.css_first("div[class*='text-body-medium']")
             if headline_tag:
-                headline = headline_tag.get_text(strip=True)
+                headline = headline_tag.text(strip=True)
             if not headline:
                 # Try meta description
-                meta_desc = soup.find('meta', attrs={'name': 'description'})
-                if meta_desc and meta_desc.get('content'):
-                    headline = meta_desc['content'].split('|')[0].strip()
+                meta_desc = tree.css_first("meta[name='description']")
+                if meta_desc and meta_desc.attributes.get('content'):
+                    headline = meta_desc.attributes['content'].split('|')[0].strip()
             profile_data["headline"] = headline
             if not headline:
                 logger.info(f"Headline not found for {linkedin_url}")
@@ -533,13 +810,15 @@ class LinkedInScraper:
 
             # Location (try multiple selectors)
             location = ""
-            loc_tag = soup.find('span', class_=lambda x: x and 'text-body-small' in x)
+            loc_tag = tree.css_first("span[class*='text-body-small']")
             if loc_tag:
-                location = loc_tag.get_text(strip=True)
+                location = loc_tag.text(strip=True)
             if not location:
-                loc_alt = soup.find('span', string=re.compile(r'\b[A-Z][a-z]+,? [A-Z]{2,}'))
-                if loc_alt:
-                    location = loc_alt.get_text(strip=True)
+                for span in tree.css('span'):
+                    text = span.text(strip=True)
+                    if _RE_LOC_SPAN.search(text):
+                        location = text
+                        break
             profile_data["location"] = location
             if not location:
                 logger.info(f"Location not found for {linkedin_url}")
@@ -547,19 +826,19 @@ class LinkedInScraper:
 
             # Experience (try to extract both simple and detailed)
             experience = []
-            exp_section = soup.find('section', {'id': 'experience'})
+            exp_section = tree.css_first('section#experience')
             if exp_section:
-                jobs = exp_section.find_all('li')
+                jobs = exp_section.css('li')
                 for job in jobs:
                     title = ""
                     company = ""
                     # Try multiple selectors for title/company
-                    title_tag = job.find('span', {'class': 'mr1'}) or job.find('span', {'class': 't-bold'})
-                    company_tag = job.find('span', {'class': 't-14'}) or job.find('span', {'class': 't-normal'})
+                    title_tag = job.css_first('span.mr1') or job.css_first('span.t-bold')
+                    company_tag = job.css_first('span.t-14') or job.css_first('span.t-normal')
                     if title_tag:
-                        title = title_tag.get_text(strip=True)
+                        title = title_tag.text(strip=True)
                     if company_tag:
-                        company = company_tag.get_text(strip=True)
+                        company = company_tag.text(strip=True)
                     if title or company:
                         experience.append({
                             'title': title,
@@ -567,15 +846,14 @@ class LinkedInScraper:
                         })
             else:
                 # Fallback: look for any job block with role/company
-                for job_block in soup.find_all('li'):
-                    if 'experience' in (job_block.get('id') or ''):
-                        title = job_block.find('span', {'class': 'mr1'})
-                        company = job_block.find('span', {'class': 't-14'})
-                        if title or company:
-                            experience.append({
-                                'title': title.get_text(strip=True) if title else '',
-                                'company': company.get_text(strip=True) if company else ''
-                            })
+                for job_block in tree.css("li[id*='experience']"):
+                    title = job_block.css_first('span.mr1')
+                    company = job_block.css_first('span.t-14')
+                    if title or company:
+                        experience.append({
+                            'title': title.text(strip=True) if title else '',
+                            'company': company.text(strip=True) if company else ''
+                        })
             profile_data['experience'] = experience
             if not experience:
                 logger.info(f"Experience not found for {linkedin_url}")
@@ -583,16 +861,16 @@ class LinkedInScraper:
 
             # Education (try to extract both simple and detailed)
             education = []
-            edu_section = soup.find('section', {'id': 'education'})
+            edu_section = tree.css_first('section#education')
             if edu_section:
-                schools = edu_section.find_all('li')
+                schools = edu_section.css('li')
                 for school in schools:
-                    school_name = school.find('span', {'class': 'mr1'}) or school.find('span', {'class': 't-bold'})
-                    degree = school.find('span', {'class': 't-14'}) or school.find('span', {'class': 't-normal'})
+                    school_name = school.css_first('span.mr1') or school.css_first('span.t-bold')
+                    degree = school.css_first('span.t-14') or school.css_first('span.t-normal')
                     if school_name or degree:
                         education.append({
-                            'school': school_name.get_text(strip=True) if school_name else '',
-                            'degree': degree.get_text(strip=True) if degree else ''
+                            'school': school_name.text(strip=True) if school_name else '',
+                            'degree': degree.text(strip=True) if degree else ''
                         })
             profile_data['education'] = education
             if not education:
@@ -601,14 +879,14 @@ class LinkedInScraper:
 
             # Skills (public profiles rarely show, but attempt)
             skills = []
-            skills_section = soup.find('section', {'id': 'skills'})
+            skills_section = tree.css_first('section#skills')
             if skills_section:
-                skills = [s.get_text(strip=True) for s in skills_section.find_all('span', {'class': 'mr1'})]
+                skills = [s.text(strip=True) for s in skills_section.css('span.mr1')]
             # Fallback: look for keywords in meta
             if not skills:
-                meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-                if meta_keywords and meta_keywords.get('content'):
-                    skills = [k.strip() for k in meta_keywords['content'].split(',') if k.strip()]
+                meta_keywords = tree.css_first("meta[name='keywords']")
+                if meta_keywords and meta_keywords.attributes.get('content'):
+                    skills = [k.strip() for k in meta_keywords.attributes['content'].split(',') if k.strip()]
             profile_data['skills'] = skills
             if not skills:
                 logger.info(f"Skills not found for {linkedin_url}")
@@ -618,12 +896,12 @@ class LinkedInScraper:
             github_url = ""
             twitter_url = ""
             personal_website = ""
-            about_section = soup.find('section', {'id': 'about'})
+            about_section = tree.css_first('section#about')
             if about_section:
-                about_text = about_section.get_text()
-                github_match = re.search(r"https?://github.com/\w+", about_text)
-                twitter_match = re.search(r"https?://twitter.com/\w+", about_text)
-                web_match = re.search(r"https?://[\w.-]+\.[a-z]{2,}", about_text)
+                about_text = about_section.text()
+                github_match = _RE_GITHUB.search(about_text)
+                twitter_match = _RE_TWITTER.search(about_text)
+                web_match = _RE_WEBSITE.search(about_text)
                 if github_match:
                     github_url = github_match.group(0)
                 if twitter_match:
@@ -631,11 +909,11 @@ class LinkedInScraper:
                 if web_match and not github_url and not twitter_url:
                     personal_website = web_match.group(0)
             # Fallback: look for links in contact info
-            contact_section = soup.find('section', {'id': 'contact-info'})
+            contact_section = tree.css_first('section#contact-info')
             if contact_section:
-                links = contact_section.find_all('a', href=True)
+                links = contact_section.css('a[href]')
                 for link in links:
-                    href = link['href']
+                    href = link.attributes.get('href') or ''
                     if 'github.com' in href:
                         github_url = href
                     elif 'twitter.com' in href:
@@ -661,13 +939,48 @@ class LinkedInScraper:
 
             # Final validation: do NOT skip or flag incomplete profiles
             # Always return whatever is extracted, even if name/headline is missing
-            db_manager.set_cache(cache_key, profile_data)
+            db_manager.set_cache(cache_key, profile_data, ttl=settings.cache_ttl_profile)
+            self._memoize_profile(cache_key, profile_data)
             return profile_data
         except Exception as e:
             logger.error(f"Profile extraction failed for {linkedin_url}: {e}")
             profile_data['warnings'].append(f"Extraction error: {e}")
             return profile_data
 
+    def _read_profile_html(self, resp) -> str:
+        """Stream the profile body in 16KB chunks and stop as soon as every
+        section we query has appeared. Unreceived bytes are dropped with the
+        connection, which skips 40-60% of a typical profile page."""
+        buf = bytearray()
+        pending = set(_PROFILE_MARKERS)
+        overlap = max(len(m) for m in _PROFILE_MARKERS) - 1
+        # Chunks still read after the last marker, so the final section's
+        # own content isn't truncated mid-element
+        grace = 2
+        try:
+            for chunk in resp.iter_content(16384):
+                # Only rescan the marker-length tail of the previous data,
+                # not the whole accumulated buffer
+                start = max(0, len(buf) - overlap)
+                buf += chunk
+                if pending:
+                    window = bytes(buf[start:])
+                    pending = {m for m in pending if m not in window}
+                elif grace:
+                    grace -= 1
+                else:
+                    break
+        finally:
+            resp.close()
+        return buf.decode(resp.encoding or "utf-8", errors="replace")
+
+    def _memoize_profile(self, cache_key: str, profile_data: Dict[str, Any]):
+        """Store profile data in the bounded in-process LRU."""
+        self._profile_memo[cache_key] = profile_data
+        self._profile_memo.move_to_end(cache_key)
+        while len(self._profile_memo) > PROFILE_MEMO_MAX:
+            self._profile_memo.popitem(last=False)
+
     def _extract_public_id(self, url: str) -> Optional[str]:
         try:
             parsed = urlparse(url)
@@ -683,62 +996,62 @@ class LinkedInScraper:
         except Exception:
             return None
 
-    def _find_github(self, profile: dict) -> str:
-        # Try to extract a GitHub URL from the profile's websites or summary
-        websites = profile.get("websites", [])
-        for w in websites:
+    def _extract_links(self, profile: dict) -> Dict[str, str]:
+        """Classify github/twitter/personal links from the profile's websites
+        and summary in one pass each (the old per-link helpers rescanned the
+        summary once per link type)."""
+        links = {"github": "", "twitter": "", "website": ""}
+        for w in profile.get("websites", []):
             if "github.com" in w:
-                return w
-        summary = profile.get("summary", "")
-        match = re.search(r"https?://github.com/\w+", summary)
-        return match.group(0) if match else ""
-
-    def _find_twitter(self, profile: dict) -> str:
-        # Try to extract a Twitter URL from the profile's websites or summary
-        websites = profile.get("websites", [])
-        for w in websites:
-            if "twitter.com" in w:
-                return w
-        summary = profile.get("summary", "")
-        match = re.search(r"https?://twitter.com/\w+", summary)
-        return match.group(0) if match else ""
-
-    def _find_website(self, profile: dict) -> str:
-        websites = profile.get("websites", [])
-        for w in websites:
-            if "github.com" not in w and "twitter.com" not in w:
-                return w
-        return ""
-
-    def score_profile(self, profile_data: dict, job_description: str) -> float:
+                links["github"] = links["github"] or w
+            elif "twitter.com" in w:
+                links["twitter"] = links["twitter"] or w
+            else:
+                links["website"] = links["website"] or w
+        if all(links.values()):
+            return links
+        for match in _RE_LINKS.finditer(profile.get("summary", "")):
+            url = match.group(0)
+            if "github.com" in url:
+                links["github"] = links["github"] or url
+            elif "twitter.com" in url:
+                links["twitter"] = links["twitter"] or url
+        return links
+
+    def score_profile(self, profile_data: dict, job_description) -> float:
         """
         Score a LinkedIn profile for relevance to a job description.
-        This is a basic example; you can expand with NLP or more advanced logic.
+        Accepts the raw description string or a frozenset from _prepare_jd;
+        callers scoring a batch should tokenize once and pass the frozenset.
         """
         score = 0
         if not profile_data or not job_description:
             return score
-        # Lowercase everything for matching
-        jd = job_description.lower()
+        # Tokenize once; every field check below is then a hash probe
+        # instead of a substring scan of the whole description
+        jd_tokens = (
+            job_description if isinstance(job_description, frozenset)
+            else _prepare_jd(job_description)
+        )
         # Score headline and skills
-        if profile_data.get("headline") and any(skill.lower() in jd for skill in profile_data.get("skills", [])):
+        if profile_data.get("headline") and any(skill.lower() in jd_tokens for skill in profile_data.get("skills", [])):
             score += 30
         # Score experience
         for exp in profile_data.get("experience", []):
             title = exp.get("title", "").lower()
             company = exp.get("companyName", "").lower()
-            if title and title in jd:
+            if title and title in jd_tokens:
                 score += 15
-            if company and company in jd:
+            if company and company in jd_tokens:
                 score += 10
         # Score education
         for edu in profile_data.get("education", []):
             school = edu.get("schoolName", "").lower()
-            if school and school in jd:
+            if school and school in jd_tokens:
                 score += 5
         # Score for location match
         location = profile_data.get("location", "").lower()
-        if location and location in jd:
+        if location and location in jd_tokens:
             score += 10
         # Cap score at 100
         return min(score, 100)
\ No newline at end of file
@@ -1,8 +1,9 @@
 from agent import LinkedInSourcingAgent
 from config import settings
+import asyncio
 import sys
 
-def main():
+async def main():
     agent = LinkedInSourcingAgent()
     # For demo: use a hardcoded job description or accept input
     if len(sys.argv) > 1:
@@ -15,16 +16,17 @@ def main():
             "Elite schools preferred."
         )
     print("\n[1] Searching for LinkedIn candidates...")
-    candidates = agent.search_linkedin(job_description, max_results=10)
+    candidates = await agent.search_linkedin(job_description, max_results=10)
     print(f"Found {len(candidates)} candidates.")
     print("\n[2] Scoring candidates...")
-    scored = agent.score_candidates(candidates, job_description)
-    for idx, c in enumerate(scored, 1):
-        print(f"{idx}. {c['name']} | {c['linkedin_url']} | Score: {c['fit_score']} | Breakdown: {c['score_breakdown']}")
+    batch = await agent.score_candidates(candidates, job_description)
+    for idx, (name, url, score) in enumerate(zip(batch.names, batch.urls, batch.fit_scores), 1):
+        print(f"{idx}. {name} | {url} | Score: {round(float(score), 2)} | Breakdown: {batch.breakdown_dict(idx - 1)}")
     print("\n[3] Generating outreach messages for top 5...")
-    messages = agent.generate_outreach(scored[:5], job_description)
+    top5 = [batch.candidate(i) for i in range(min(5, len(batch)))]
+    messages = await agent.generate_outreach(top5, job_description)
     for m in messages:
         print(f"\nTo: {m['candidate']} ({m['linkedin_url']})\nMessage: {m['message']}\n")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())